@@ -1,10 +1,18 @@
+import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from config.logging_config import configure_logging
 from config.settings import settings
+from rag.vector_store_registry import create_vector_store_registry
+from rag.executors import shutdown_executors
+from rag.llm_clients import get_llm_client_pool, close_llm_client_pool
 
 # Import route modules
-from api.routes import recommendations, health, routes_list
+from api.routes import recommendations, health, routes_list, index, metrics
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
@@ -14,14 +22,21 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events.
     """
     # 🟢 STARTUP: Initialize recommendation system
-    print("🚀 Starting up recommendation API...")
-    recommendations.initialize_recommendation_system()
-    print("✅ Startup complete!")
+    logger.info("🚀 Starting up recommendation API...")
+    # One registry owns the FAISS index + embedding model for every route
+    registry = create_vector_store_registry(name=settings.VECTOR_STORE_NAME)
+    app.state.vector_store_registry = registry
+    recommendations.initialize_recommendation_system(registry)
+    # Pooled LLM clients are created once and shared by every request
+    get_llm_client_pool()
+    logger.info("✅ Startup complete!")
     
     yield  # ⏸️ App runs here - handles all requests
     
     # 🔴 SHUTDOWN: Cleanup (if needed)
-    print("🛑 Shutting down...")
+    logger.info("🛑 Shutting down...")
+    shutdown_executors()
+    await close_llm_client_pool()
 
 
 app = FastAPI(
@@ -44,6 +59,8 @@ app.add_middleware(
 app.include_router(health.router, tags=["Health"])
 app.include_router(recommendations.router, tags=["Recommendations"])
 app.include_router(routes_list.router, tags=["Routes"])
+app.include_router(index.router, tags=["Index"])
+app.include_router(metrics.router, tags=["Metrics"])
 
 
 @app.get("/")
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List, Dict, Any
+
+router = APIRouter(prefix="/api/index", tags=["Index"])
+
+
+class CatalogDiff(BaseModel):
+    upsert: List[Dict[str, Any]] = []
+    delete: List[Any] = []
+
+
+@router.post("/diff")
+async def apply_catalog_diff(diff: CatalogDiff) -> Dict[str, Any]:
+    """
+    Incrementally update the product index and hot-swap it in.
+    
+    - **upsert**: New or changed products (unchanged ones are detected by content hash and skipped)
+    - **delete**: Product ids to remove
+    """
+    from api.routes.recommendations import get_vector_store_registry
+    from rag.executors import run_cpu_bound
+    from rag.index_maintenance import apply_diff_to_store
+    
+    registry = get_vector_store_registry()
+    try:
+        summary = await run_cpu_bound(
+            apply_diff_to_store,
+            {"upsert": diff.upsert, "delete": diff.delete},
+            registry=registry
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error applying catalog diff: {str(e)}")
+    
+    return {**summary, "index_version": registry.version}
@@ -1,33 +1,55 @@
-from fastapi import APIRouter, HTTPException
+import logging
+import json
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Awaitable, Callable, Hashable, Literal, Optional
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/recommendations", tags=["Recommendations"])
 
 # Global variables to be initialized by lifespan
 _recommendation_fn = None
+_vector_store_registry = None
 
 
-def initialize_recommendation_system():
-    """Initialize vectorstore and recommendation graph - called by lifespan"""
-    global _recommendation_fn
+def initialize_recommendation_system(registry=None):
+    """
+    Initialize vectorstore registry and recommendation graphs - called by lifespan.
     
-    from rag.agent.recommendation_agent import build_recommendation_graph
-    from rag.create_vector_store import create_load_vector_store
-    from config.settings import settings
+    The graphs borrow the live store from the registry on every search, so a
+    registry.swap()/reload() is picked up without rebuilding them.
+    """
+    global _recommendation_fn, _vector_store_registry
     
-    print("🚀 Initializing recommendation system...")
-    products_path = Path(__file__).parent.parent.parent / "data" / "products.json"
+    from rag.agent.cascade import build_cascading_recommender
+    from rag.vector_store_registry import create_vector_store_registry
+    from config.settings import settings
     
-    vectorstore = create_load_vector_store(
-        name=settings.VECTOR_STORE_NAME,
-        products_path=products_path
-    )
+    logger.info("🚀 Initializing recommendation system...")
+    if registry is None:
+        products_path = Path(__file__).parent.parent.parent / "data" / "products.json"
+        registry = create_vector_store_registry(
+            name=settings.VECTOR_STORE_NAME,
+            products_path=products_path
+        )
+    _vector_store_registry = registry
     
-    # Build the graph - this already includes explain_recommendations_node!
-    _recommendation_fn = build_recommendation_graph(vectorstore)
-    print("✅ Recommendation system initialized")
+    # Fast (simple_rag) and full (LLM) graphs behind one mode switch
+    _recommendation_fn = build_cascading_recommender(registry)
+    logger.info("✅ Recommendation system initialized")
+
+
+def get_vector_store_registry():
+    """Get the shared vectorstore registry (must be initialized via lifespan)"""
+    if _vector_store_registry is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Vector store not initialized. Please wait for startup to complete."
+        )
+    return _vector_store_registry
 
 
 def get_recommendation_function():
@@ -44,6 +66,13 @@ def get_recommendation_function():
 class RecommendationRequest(BaseModel):
     query: str
     max_results: Optional[int] = None
+    mode: Optional[Literal["fast", "full", "auto"]] = None  # defaults to RECOMMENDATION_MODE
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    k: Optional[int] = None
+    max_score: Optional[float] = None
 
 
 class RecommendationResponse(BaseModel):
@@ -52,14 +81,67 @@ class RecommendationResponse(BaseModel):
     explanation: str
     total_results: int
     intent: Optional[Dict[str, Any]] = None
+    pipeline: Optional[str] = None  # "fast" or "full" - which pipeline answered
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as for GET revalidation: W/"x" matches "x"
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+async def _cached_json_response(
+    http_request: Request,
+    key: Hashable,
+    compute: Callable[[], Awaitable[bytes]],
+) -> Response:
+    """
+    JSON response from the response cache (computed on a miss) with ETag and
+    Cache-Control headers; 304 Not Modified when If-None-Match has the current ETag.
+    """
+    from rag.response_cache import compute_etag, get_response_cache
+    from config.settings import settings
+    
+    cache = get_response_cache()
+    if cache is None:
+        body = await compute()
+        headers = {"ETag": compute_etag(body), "Cache-Control": "no-cache"}
+    else:
+        lookup = await cache.get_or_compute(key, compute)
+        body = lookup.response.body
+        max_age = max(0, int(settings.RESPONSE_CACHE_TTL_SECONDS - lookup.age))
+        headers = {
+            "ETag": lookup.response.etag,
+            "Cache-Control": f"max-age={max_age}, stale-while-revalidate={int(settings.RESPONSE_CACHE_STALE_SECONDS)}",
+            "Age": str(int(lookup.age)),
+            "X-Cache": lookup.status.upper(),
+        }
+    if _etag_matches(http_request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _cache_key(endpoint: str, query: str, *options) -> Hashable:
+    """
+    Request plus catalog version and model settings. The query is used as sent, not
+    normalized: it is echoed in the body, so "Kitten FOOD" must not get "kitten food"'s
+    response (the embedding and intent caches below still share the work).
+    """
+    from rag.response_cache import model_fingerprint
+    
+    return (endpoint, query, options, get_vector_store_registry().version, model_fingerprint())
 
 
 @router.post("/", response_model=RecommendationResponse)
-async def get_recommendations(request: RecommendationRequest) -> RecommendationResponse:
+async def get_recommendations(request: RecommendationRequest, http_request: Request) -> Response:
     """
     Get product recommendations based on a natural language query.
     
-    The graph automatically handles:
+    The full graph automatically handles:
     - Intent analysis
     - Product search
     - Result refinement
@@ -68,12 +150,18 @@ async def get_recommendations(request: RecommendationRequest) -> RecommendationR
     
     - **query**: User's search query (e.g., "I need a laptop for gaming")
     - **max_results**: Optional limit on number of recommendations
+    - **mode**: `fast` (regex refine + data-driven explanation, no LLM calls),
+      `full` (LLM intent analysis and explanation) or `auto` (fast first, escalating
+      to full when the result looks unreliable)
+    
+    Responses are cached (see `RESPONSE_CACHE_*`) and carry an `ETag`; send it back
+    in `If-None-Match` to get `304 Not Modified` while the answer is unchanged.
     """
-    try:
-        recommend = get_recommendation_function()
-        
-        # Just call it like in test_agent.py - the explain node is already in the graph!
-        result = recommend(request.query)
+    recommend = get_recommendation_function()
+    
+    async def compute() -> bytes:
+        # Async run keeps the event loop free while the LLM calls are in flight
+        result = await recommend.arun(request.query, mode=request.mode)
         
         recommendations = result.get("recommendations", [])
         if request.max_results:
@@ -84,52 +172,161 @@ async def get_recommendations(request: RecommendationRequest) -> RecommendationR
             recommendations=recommendations,
             explanation=result.get("explanation", ""),
             total_results=len(recommendations),
-            intent=result.get("intent")
-        )
+            intent=result.get("intent"),
+            pipeline=result.get("pipeline")
+        ).model_dump_json().encode()
+    
+    try:
+        key = _cache_key("recommendations", request.query, request.max_results, request.mode)
+        return await _cached_json_response(http_request, key, compute)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing recommendation: {str(e)}")
 
 
+def _sse_event(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/stream")
+async def stream_recommendations(request: RecommendationRequest) -> StreamingResponse:
+    """
+    Stream recommendations as Server-Sent Events.
+    
+    Events, in order:
+    - **intent**: analyzed intent, as soon as intent analysis finishes
+    - **recommendations**: refined product list
+    - **explanation_delta**: explanation text chunks (`{"delta": "..."}`) as the LLM produces them
+    - **done**: the complete response (same shape as `POST /api/recommendations/`)
+    - **error**: emitted instead if the pipeline fails mid-stream
+    
+    Answers from the fast pipeline (see `mode`) have no intent event and a single explanation_delta.
+    """
+    recommend = get_recommendation_function()
+    
+    async def event_stream():
+        try:
+            async for event, data in recommend.astream(request.query, mode=request.mode):
+                if event == "recommendations":
+                    if request.max_results:
+                        data = data[:request.max_results]
+                    yield _sse_event(event, {"recommendations": data, "total_results": len(data)})
+                elif event == "explanation_delta":
+                    yield _sse_event(event, {"delta": data})
+                elif event == "done":
+                    recommendations = data.get("recommendations", [])
+                    if request.max_results:
+                        recommendations = recommendations[:request.max_results]
+                    yield _sse_event(event, {
+                        **data,
+                        "recommendations": recommendations,
+                        "total_results": len(recommendations),
+                    })
+                else:
+                    yield _sse_event(event, data)
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Error processing recommendation: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/search")
 async def search_products(
+    http_request: Request,
     q: str,
     k: Optional[int] = None,
-    max_score: Optional[float] = None
-) -> Dict[str, Any]:
+    max_score: Optional[float] = None,
+    mode: Optional[Literal["vector", "hybrid"]] = None
+) -> Response:
     """
     Direct product search using vector similarity.
     
     - **q**: Search query
     - **k**: Number of results (defaults to config value)
     - **max_score**: Maximum similarity score threshold
+    - **mode**: `vector` or `hybrid` (BM25 + vector with reciprocal rank fusion; exact
+      name/brand queries are answered from BM25 alone). Defaults to `RETRIEVAL_MODE`
+    
+    Cached and conditional (`ETag` / `If-None-Match`) like `POST /api/recommendations/`.
     """
-    try:
+    registry = get_vector_store_registry()
+    from config.settings import settings
+    
+    k = k or settings.DEFAULT_SEARCH_K
+    max_score = max_score or settings.MAX_SIMILARITY_SCORE
+    
+    async def compute() -> bytes:
         from rag.query import query_vector_store
-        from rag.create_vector_store import create_load_vector_store
-        from config.settings import settings
+        from rag.executors import run_cpu_bound
         
-        products_path = Path(__file__).parent.parent.parent / "data" / "products.json"
-        vectorstore = create_load_vector_store(
-            name=settings.VECTOR_STORE_NAME,
-            products_path=products_path
+        results = await run_cpu_bound(
+            query_vector_store,
+            q,
+            vectorstore=registry,
+            k=k,
+            format_results=True,
+            max_score=max_score,
+            mode=mode
         )
         
-        k = k or settings.DEFAULT_SEARCH_K
-        max_score = max_score or settings.MAX_SIMILARITY_SCORE
+        return json.dumps({
+            "query": q,
+            "results": results,
+            "count": len(results)
+        }, default=str).encode()
+    
+    try:
+        return await _cached_json_response(http_request, _cache_key("search", q, k, max_score, mode), compute)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching products: {str(e)}")
+
+
+
+@router.post("/search/batch")
+async def search_products_batch(request: BatchSearchRequest) -> Dict[str, Any]:
+    """
+    Vector search for many queries at once (one embedding pass, one FAISS call).
+    
+    - **queries**: Search queries; results are returned in the same order
+    - **k**: Number of results per query (defaults to config value)
+    - **max_score**: Maximum similarity score threshold
+    """
+    from config.settings import settings
+    
+    if len(request.queries) > settings.MAX_BATCH_QUERIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.MAX_BATCH_QUERIES} queries per batch"
+        )
+    registry = get_vector_store_registry()
+    try:
+        from rag.query import query_vector_store_batch
+        from rag.executors import run_cpu_bound
         
-        results = query_vector_store(
-            q,
-            vectorstore=vectorstore,
+        k = request.k or settings.DEFAULT_SEARCH_K
+        max_score = request.max_score or settings.MAX_SIMILARITY_SCORE
+        
+        batch_results = await run_cpu_bound(
+            query_vector_store_batch,
+            request.queries,
+            vectorstore=registry,
             k=k,
             format_results=True,
             max_score=max_score
         )
         
         return {
-            "query": q,
-            "results": results,
-            "count": len(results)
+            "results": [
+                {"query": q, "results": results, "count": len(results)}
+                for q, results in zip(request.queries, batch_results)
+            ],
+            "count": len(batch_results)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching products: {str(e)}")
-
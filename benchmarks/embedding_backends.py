@@ -0,0 +1,112 @@
+"""
+Compare the torch and ONNX embedding backends.
+
+Each backend is measured in a fresh subprocess so cold start includes imports:
+    python -m benchmarks.embedding_backends [--queries 200] [--min-cosine 0.99]
+
+Reports startup time, per-query latency (p50/p99), whether torch was imported,
+and how closely the ONNX vectors match the torch ones on the product catalog.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SAMPLE_QUERIES = [
+    "running shoes under $200",
+    "food for my pet",
+    "gift for a coffee lover",
+    "lightweight laptop for travel",
+    "senior dog joint support",
+]
+
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from rag.embeddings import create_base_embeddings
+from rag.load_products import load_products
+from rag.ingest import create_product_content
+embeddings = create_base_embeddings()
+startup = time.perf_counter() - start
+
+queries = json.loads(sys.argv[1])
+n = int(sys.argv[2])
+latencies = []
+for i in range(n):
+    t0 = time.perf_counter()
+    embeddings.embed_query(queries[i % len(queries)])
+    latencies.append(time.perf_counter() - t0)
+
+products = load_products(sys.argv[3])
+vectors = embeddings.embed_documents([create_product_content(p) for p in products])
+print("__RESULT__" + json.dumps({
+    "startup_seconds": startup,
+    "latencies": latencies,
+    "torch_imported": "torch" in sys.modules,
+    "vectors": vectors,
+}))
+"""
+
+
+def run_backend(backend: str, queries: int, products_path: Path) -> dict:
+    env = {**os.environ, "EMBEDDING_BACKEND": backend}
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, json.dumps(SAMPLE_QUERIES), str(queries), str(products_path)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    payload = completed.stdout.split("__RESULT__", 1)[1]
+    return json.loads(payload)
+
+
+def summarize(result: dict) -> dict:
+    latencies_ms = np.array(result["latencies"]) * 1000
+    return {
+        "startup_seconds": round(result["startup_seconds"], 3),
+        "query_p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "query_p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "torch_imported": result["torch_imported"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Torch vs ONNX embedding benchmark")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--min-cosine", type=float, default=0.99,
+                        help="Minimum per-product cosine similarity between backends")
+    parser.add_argument("--products", type=Path, default=PROJECT_ROOT / "data" / "products.json")
+    parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    results = {backend: run_backend(backend, args.queries, args.products) for backend in ("torch", "onnx")}
+
+    torch_vectors = np.array(results["torch"]["vectors"])
+    onnx_vectors = np.array(results["onnx"]["vectors"])
+    cosines = (torch_vectors * onnx_vectors).sum(axis=1) / (
+        np.linalg.norm(torch_vectors, axis=1) * np.linalg.norm(onnx_vectors, axis=1)
+    )
+    report = {
+        "backends": {backend: summarize(result) for backend, result in results.items()},
+        "agreement": {
+            "min_cosine": round(float(cosines.min()), 6),
+            "max_abs_diff": round(float(np.abs(torch_vectors - onnx_vectors).max()), 6),
+            "within_tolerance": bool(cosines.min() >= args.min_cosine),
+        },
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return 0 if report["agreement"]["within_tolerance"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Recall vs latency for the FAISS index types supported by rag.index_factory.
+
+Builds every configuration on the same synthetic catalog and reports recall@k
+against exact (Flat) search, p50/p99 single-query latency and build time:
+    python -m benchmarks.faiss_index_types [--vectors 100000] [--dim 384] [--k 15]
+"""
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from rag.index_factory import IndexSpec, build_index
+
+
+def synthetic_catalog(num_vectors: int, dim: int, num_queries: int, seed: int = 0):
+    """Clustered unit vectors - closer to sentence embeddings than uniform noise"""
+    rng = np.random.default_rng(seed)
+    num_clusters = max(1, num_vectors // 500)
+    centers = rng.standard_normal((num_clusters, dim)).astype(np.float32)
+    assignments = rng.integers(0, num_clusters, num_vectors + num_queries)
+    points = centers[assignments] + 0.35 * rng.standard_normal((len(assignments), dim)).astype(np.float32)
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+    return points[:num_vectors], points[num_vectors:]
+
+
+def default_specs(num_vectors: int):
+    nlist = max(1, int(4 * math.sqrt(num_vectors)))
+    specs = [IndexSpec(kind="flat")]
+    for m in (16, 32):
+        for ef_search in (16, 64, 128):
+            specs.append(IndexSpec(kind="hnsw", hnsw_m=m, hnsw_ef_search=ef_search))
+    for nprobe in (1, 8, 32):
+        specs.append(IndexSpec(kind="ivf", ivf_nlist=nlist, ivf_nprobe=nprobe))
+    for nprobe in (8, 32):
+        specs.append(IndexSpec(kind="ivfpq", ivf_nlist=nlist, ivf_nprobe=nprobe, pq_m=16, pq_nbits=8))
+    return specs
+
+
+def benchmark_spec(spec: IndexSpec, vectors, queries, ground_truth, k: int) -> dict:
+    start = time.perf_counter()
+    index = build_index(vectors, spec)
+    build_seconds = time.perf_counter() - start
+
+    latencies, found = [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - t0)
+        found.append(ids[0])
+
+    recall = np.mean([
+        len(set(row.tolist()) & set(truth.tolist())) / k
+        for row, truth in zip(found, ground_truth)
+    ])
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "index": spec.fitted_to(len(vectors)).label(),
+        f"recall@{k}": round(float(recall), 4),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 4),
+        "build_seconds": round(build_seconds, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FAISS index recall/latency benchmark")
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=15)
+    parser.add_argument("--threads", type=int, default=1, help="FAISS OpenMP threads")
+    parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    import faiss
+    faiss.omp_set_num_threads(args.threads)
+
+    vectors, queries = synthetic_catalog(args.vectors, args.dim, args.queries)
+    exact = faiss.IndexFlatL2(args.dim)
+    exact.add(vectors)
+    _, ground_truth = exact.search(queries, args.k)
+
+    report = {
+        "catalog": {"vectors": args.vectors, "dim": args.dim, "queries": args.queries, "k": args.k},
+        "results": [],
+    }
+    for spec in default_specs(args.vectors):
+        result = benchmark_spec(spec, vectors, queries, ground_truth, args.k)
+        print(json.dumps(result))
+        report["results"].append(result)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Offline stand-in for rag.llm_clients.LLMClientPool.
+
+Answers with a fixed latency and deterministic output so pipeline benchmarks
+measure our own code rather than the network or the model:
+    from benchmarks.fake_llm import FakeLLMClientPool
+    set_llm_client_pool(FakeLLMClientPool(intent_latency_ms=300, explanation_latency_ms=800))
+"""
+import asyncio
+import re
+import time
+from typing import Dict
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from rag.price_patterns import MAX_PRICE_PATTERN, MIN_PRICE_PATTERN, parse_price_bounds
+
+QUERY_IN_PROMPT = re.compile(r'(?:following query: |User asked: ")(.*?)(?:"|$)', re.S)
+GIFT_WORDS = ("gift", "present", "for my")
+
+
+def _query_from_prompt(prompt) -> str:
+    text = prompt if isinstance(prompt, str) else str(prompt)
+    match = QUERY_IN_PROMPT.search(text)
+    return match.group(1).strip() if match else text.strip()
+
+
+def fake_intent(query: str):
+    """Deterministic understand_promt for query: regex price bounds, the rest is the product"""
+    from rag.analazye_promt import understand_promt
+
+    min_price, max_price = parse_price_bounds(query)
+    price_range = {}
+    if min_price is not None:
+        price_range["min"] = min_price
+    if max_price is not None:
+        price_range["max"] = max_price
+
+    product = MIN_PRICE_PATTERN.sub("", MAX_PRICE_PATTERN.sub("", query.lower())).strip(" $,.") or query
+    intent = "gift" if any(word in query.lower() for word in GIFT_WORDS) else "search"
+    return understand_promt(intent=intent, product=product, price_range=price_range or None)
+
+
+class FakeIntentRunnable:
+    """Replaces intent_llm.with_structured_output(understand_promt)"""
+
+    def __init__(self, latency_ms: float):
+        self.latency_s = latency_ms / 1000
+
+    def invoke(self, prompt, config=None, **kwargs):
+        time.sleep(self.latency_s)
+        return fake_intent(_query_from_prompt(prompt))
+
+    async def ainvoke(self, prompt, config=None, **kwargs):
+        await asyncio.sleep(self.latency_s)
+        return fake_intent(_query_from_prompt(prompt))
+
+
+class FakeChatModel:
+    """Replaces the explanation ChatOpenAI; latency is spread over the streamed chunks"""
+
+    def __init__(self, latency_ms: float, chunks: int = 8):
+        self.latency_s = latency_ms / 1000
+        self.chunks = max(1, chunks)
+
+    def _answer(self, prompt) -> str:
+        query = _query_from_prompt(prompt)
+        return (
+            f"These products closely match \"{query}\" on the features you asked for. "
+            f"They are well rated and priced within your range."
+        )
+
+    def invoke(self, prompt, config=None, **kwargs):
+        time.sleep(self.latency_s)
+        return AIMessage(content=self._answer(prompt))
+
+    async def ainvoke(self, prompt, config=None, **kwargs):
+        await asyncio.sleep(self.latency_s)
+        return AIMessage(content=self._answer(prompt))
+
+    async def astream(self, prompt, config=None, **kwargs):
+        words = self._answer(prompt).split(" ")
+        step = max(1, -(-len(words) // self.chunks))
+        for start in range(0, len(words), step):
+            await asyncio.sleep(self.latency_s / self.chunks)
+            yield AIMessageChunk(content=" ".join(words[start:start + step]) + " ")
+
+
+class FakeLLMClientPool:
+    """Same surface as LLMClientPool, no network"""
+
+    def __init__(self, intent_latency_ms: float = 0.0, explanation_latency_ms: float = 0.0):
+        self.intent_runnable = FakeIntentRunnable(intent_latency_ms)
+        self.explanation_llm = FakeChatModel(explanation_latency_ms)
+
+    def connection_stats(self) -> Dict[str, int]:
+        return {"requests": 0, "connections_opened": 0, "connections_reused": 0}
+
+    async def aclose(self) -> None:
+        pass
@@ -0,0 +1,249 @@
+"""
+End-to-end latency of the recommendation graphs, fully offline.
+
+Runs build_recommendation_graph, build_simple_recommendation_graph and the
+auto-mode cascade between them (reporting its escalation rate) against a
+fake LLM (fixed latency, deterministic understand_promt) and, by default, a
+hash-based embedding, then reports per-node wall time, request p50/p95/p99 and
+throughput at the requested concurrency:
+    python -m benchmarks.pipeline_latency [--requests 200] [--concurrency 8]
+        [--intent-latency-ms 300] [--explanation-latency-ms 800]
+        [--embeddings hash|model] [--output runs/pipeline.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+
+# The fake pool never calls OpenAI, but rag.analazye_promt refuses to import without a key
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from benchmarks.fake_llm import FakeLLMClientPool
+from config.settings import settings
+
+SAMPLE_QUERIES = [
+    "running shoes under $200",
+    "food for my pet",
+    "gift for a coffee lover",
+    "lightweight laptop for travel",
+    "senior dog joint support",
+    "moisturizer for dry skin under $30",
+    "wireless headphones with noise cancellation",
+    "kitten food over $10",
+]
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Collects wall time per LangGraph node from the chain callbacks"""
+
+    run_inline = True  # time on the event loop, not in a callback executor
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started: Dict = {}
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # Runnables inside a node inherit its metadata; only time the node itself
+        if node is not None and kwargs.get("name") == node:
+            with self._lock:
+                self._started[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def _finish(self, run_id) -> None:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is not None:
+                node, start = started
+                self.durations[node].append(time.perf_counter() - start)
+
+
+def summarize_ms(seconds: List[float]) -> Dict[str, float]:
+    values = np.array(seconds) * 1000
+    if not len(values):
+        return {"count": 0}
+    return {
+        "count": int(len(values)),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+    }
+
+
+def create_benchmark_embeddings(kind: str, dim: int):
+    from rag.embedding_cache import CachedQueryEmbeddings
+
+    if kind == "model":
+        from rag.create_vector_store import create_embeddings
+        return create_embeddings()
+
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    return CachedQueryEmbeddings(
+        DeterministicFakeEmbedding(size=dim),
+        model_name=f"hash:{dim}",
+        max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+    )
+
+
+async def run_load(run, queries: List[str], requests: int, concurrency: int, warmup: int) -> Dict:
+    """Fire requests through run.arun with at most concurrency in flight"""
+    for query in queries[:warmup]:
+        await run.arun(query)
+
+    timer = NodeTimer()
+    config = {"callbacks": [timer]}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    pipelines: List[str] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await run.arun(queries[i % len(queries)], config=config)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+            if "pipeline" in response:
+                pipelines.append(response["pipeline"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall_seconds = time.perf_counter() - started
+
+    result = {
+        "requests": requests,
+        "errors": errors,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(latencies) / wall_seconds, 3) if wall_seconds else 0.0,
+        "latency": summarize_ms(latencies),
+        "nodes": {node: summarize_ms(values) for node, values in sorted(timer.durations.items())},
+    }
+    if pipelines:
+        result["escalation_rate"] = round(pipelines.count("full") / len(pipelines), 4)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline per-node latency benchmark of the recommendation graphs")
+    parser.add_argument("--graphs", nargs="+", choices=["full", "simple", "auto"],
+                        default=["full", "simple", "auto"])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--intent-latency-ms", type=float, default=300.0)
+    parser.add_argument("--explanation-latency-ms", type=float, default=800.0)
+    parser.add_argument("--embeddings", choices=["hash", "model"], default="hash",
+                        help="hash: deterministic fake embedding (no model download); model: EMBEDDING_MODEL")
+    parser.add_argument("--dim", type=int, default=384, help="Hash embedding dimension")
+    parser.add_argument("--speculative", choices=["on", "off"], default=None,
+                        help="Override SPECULATIVE_SEARCH_ENABLED for the full graph")
+    parser.add_argument("--rule-intents", choices=["on", "off"], default=None,
+                        help="Override RULE_INTENT_ENABLED (local intent parsing before the fake LLM)")
+    parser.add_argument("--single-flight", choices=["on", "off"], default=None,
+                        help="Override SINGLE_FLIGHT_ENABLED (identical in-flight queries share one execution)")
+    parser.add_argument("--keep-caches", action="store_true",
+                        help="Leave intent/explanation caches on (off by default so every request hits the fake LLM)")
+    parser.add_argument("--queries-file", type=Path, default=None, help="One query per line")
+    parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log per-request pipeline progress (LOG_LEVEL=DEBUG; default only warnings)")
+    args = parser.parse_args(argv)
+
+    from rag.agent.cascade import build_cascading_recommender
+    from rag.agent.recommendation_agent import build_recommendation_graph
+    from rag.create_vector_store import create_load_vector_store
+    from rag.llm_clients import set_llm_client_pool
+    from simple_rag.agent.simple_recommendation_agent import build_simple_recommendation_graph
+    from rag.vector_store_registry import DEFAULT_PRODUCTS_PATH
+
+    if not args.keep_caches:
+        settings.INTENT_CACHE_SIZE = 0
+        settings.EXPLANATION_CACHE_SIZE = 0
+    if args.rule_intents is not None:
+        settings.RULE_INTENT_ENABLED = args.rule_intents == "on"
+    if args.single_flight is not None:
+        settings.SINGLE_FLIGHT_ENABLED = args.single_flight == "on"
+    if args.embeddings == "hash":
+        # Hash vectors carry no meaning, so a score threshold would drop every result
+        settings.MAX_SIMILARITY_SCORE = None
+    queries = SAMPLE_QUERIES
+    if args.queries_file:
+        queries = [line.strip() for line in args.queries_file.read_text().splitlines() if line.strip()]
+
+    set_llm_client_pool(FakeLLMClientPool(args.intent_latency_ms, args.explanation_latency_ms))
+    from config.logging_config import configure_logging
+    configure_logging("DEBUG" if args.verbose else "WARNING")
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "intent_latency_ms": args.intent_latency_ms,
+            "explanation_latency_ms": args.explanation_latency_ms,
+            "embeddings": args.embeddings,
+            "faiss_index_type": settings.FAISS_INDEX_TYPE,
+            "cpu_executor_workers": settings.CPU_EXECUTOR_WORKERS,
+            "rule_intents": settings.RULE_INTENT_ENABLED,
+            "single_flight": settings.SINGLE_FLIGHT_ENABLED,
+            "caches": args.keep_caches,
+        },
+        "graphs": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="pipeline-bench-") as tmp:
+        embeddings = create_benchmark_embeddings(args.embeddings, args.dim)
+        vectorstore = create_load_vector_store(
+            name=str(Path(tmp) / "store"),
+            products_path=DEFAULT_PRODUCTS_PATH,
+            embeddings=embeddings,
+        )
+        builders = {
+            "full": lambda: build_recommendation_graph(
+                vectorstore,
+                speculative=None if args.speculative is None else args.speculative == "on",
+            ),
+            "simple": lambda: build_simple_recommendation_graph(vectorstore),
+            "auto": lambda: SimpleNamespace(
+                arun=partial(build_cascading_recommender(vectorstore).arun, mode="auto")
+            ),
+        }
+        for graph in args.graphs:
+            result = asyncio.run(run_load(
+                builders[graph](), queries, args.requests, args.concurrency, args.warmup
+            ))
+            report["graphs"][graph] = result
+            print(json.dumps({"graph": graph, **result}), file=sys.stderr)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
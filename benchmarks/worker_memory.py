@@ -0,0 +1,170 @@
+"""
+Per-worker memory of N serving processes sharing one vector store (Linux only).
+
+Spawns 1, 4 and 8 workers (like uvicorn --workers), each loading the store
+through create_load_vector_store and running searches, with FAISS_MMAP off and
+on. Once every worker has loaded, each reports RSS, PSS (shared pages split
+between the processes mapping them) and USS (private pages) from
+/proc/self/smaps_rollup; "overhead" is the growth over the bare interpreter:
+    python -m benchmarks.worker_memory [--rows 100000] [--workers 1 4 8]
+        [--embeddings hash|model] [--store vector_stores/products] [--output runs/memory.json]
+"""
+import argparse
+import json
+import multiprocessing as mp
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.pipeline_latency import SAMPLE_QUERIES, create_benchmark_embeddings
+from config.settings import settings
+
+
+def read_memory_mb() -> Dict[str, float]:
+    """RSS / PSS / USS / shared of the current process in MB"""
+    fields = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1]) / 1024
+    return {
+        "rss_mb": fields["Rss"],
+        "pss_mb": fields["Pss"],
+        "uss_mb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared_mb": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+def synthetic_products(products_path: Path, rows: int) -> List[dict]:
+    """The sample catalog repeated to rows products with distinct ids and names"""
+    with open(products_path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    products = []
+    for i in range(rows):
+        product = dict(base[i % len(base)])
+        product["id"] = i + 1
+        product["name"] = f"{product['name']} #{i // len(base)}"
+        products.append(product)
+    return products
+
+
+def _worker(store_path: str, mmap: bool, embeddings_kind: str, dim: int, searches: int, barrier, results) -> None:
+    baseline = read_memory_mb()
+    settings.FAISS_MMAP = mmap
+    settings.MAX_SIMILARITY_SCORE = None
+
+    from rag.create_vector_store import create_load_vector_store
+
+    embeddings = create_benchmark_embeddings(embeddings_kind, dim)
+    vectorstore = create_load_vector_store(name=store_path, embeddings=embeddings)
+    for i in range(searches):
+        # Flat search scans every vector; the docstore lookups touch the metadata columns
+        vectorstore.similarity_search_with_score(SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)], k=15)
+
+    barrier.wait()  # measure while every worker is alive, so shared pages are split between them
+    loaded = read_memory_mb()
+    results.put({
+        "baseline": baseline,
+        "loaded": loaded,
+        "overhead": {key: loaded[key] - baseline[key] for key in loaded},
+    })
+    barrier.wait()  # nobody exits (unmapping its pages) before everyone has measured
+
+
+def measure(store_path: Path, workers: int, mmap: bool, embeddings_kind: str, dim: int, searches: int) -> Dict:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=_worker, args=(str(store_path), mmap, embeddings_kind, dim, searches, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    def mean(section: str, key: str) -> float:
+        return round(float(np.mean([report[section][key] for report in reports])), 1)
+
+    return {
+        "workers": workers,
+        "mmap": mmap,
+        "per_worker": {key: mean("loaded", key) for key in reports[0]["loaded"]},
+        "per_worker_overhead": {key: mean("overhead", key) for key in reports[0]["overhead"]},
+        "total_pss_mb": round(sum(report["loaded"]["pss_mb"] for report in reports), 1),
+    }
+
+
+def _store_size_mb(store_path: Path) -> Dict[str, float]:
+    from rag.metadata_store import METADATA_DIR
+
+    metadata_bytes = sum(p.stat().st_size for p in (store_path / METADATA_DIR).glob("*") if p.is_file())
+    return {
+        "index_faiss_mb": round((store_path / "index.faiss").stat().st_size / 2**20, 1),
+        "metadata_mb": round(metadata_bytes / 2**20, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-worker RSS/PSS with and without a memory-mapped FAISS index")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic catalog size")
+    parser.add_argument("--searches", type=int, default=50, help="Searches per worker before measuring")
+    parser.add_argument("--embeddings", choices=["hash", "model"], default="hash",
+                        help="hash: deterministic fake embedding (no model download); model: EMBEDDING_MODEL")
+    parser.add_argument("--dim", type=int, default=384, help="Hash embedding dimension")
+    parser.add_argument("--store", type=Path, default=None,
+                        help="Measure an existing vector store directory instead of building a synthetic one")
+    parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        parser.error("needs /proc/self/smaps_rollup (Linux)")
+
+    from rag.vector_store_registry import DEFAULT_PRODUCTS_PATH
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "rows": None if args.store else args.rows,
+            "embeddings": args.embeddings,
+            "metadata_backend": settings.METADATA_BACKEND,
+            "faiss_index_type": settings.FAISS_INDEX_TYPE,
+        },
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="worker-memory-") as tmp:
+        store_path = args.store.resolve() if args.store else Path(tmp) / "store"
+        if args.store is None:
+            from rag.create_vector_store import create_load_vector_store
+
+            products_path = Path(tmp) / "products.json"
+            products_path.write_text(json.dumps(synthetic_products(DEFAULT_PRODUCTS_PATH, args.rows)))
+            create_load_vector_store(
+                name=str(store_path),
+                products_path=products_path,
+                embeddings=create_benchmark_embeddings(args.embeddings, args.dim),
+            )
+        report["store"] = _store_size_mb(store_path)
+
+        for mmap in (False, True):
+            for workers in args.workers:
+                result = measure(store_path, workers, mmap, args.embeddings, args.dim, args.searches)
+                report["runs"].append(result)
+                print(json.dumps(result), file=sys.stderr)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+import logging
+from typing import Optional
+
+from config.settings import settings
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """Root logging setup for the API and CLIs (LOG_LEVEL gates per-request messages)"""
+    logging.basicConfig(level=(level or settings.LOG_LEVEL).upper(), format=LOG_FORMAT)
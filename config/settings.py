@@ -8,19 +8,83 @@ class Settings(BaseSettings):
     # Vector Store Settings
     VECTOR_STORE_NAME: str = "alexs_vectorstore"
     EMBEDDING_MODEL: str = "sentence-transformers/multi-qa-MiniLM-L6-cos-v1"
+    METADATA_BACKEND: str = "columnar"  # "columnar" (memory-mapped, no unpickling) or "pickle" (index.pkl docstore)
+    FAISS_INDEX_TYPE: str = "flat"  # flat | hnsw | ivf | ivfpq (applies when the index is built)
+    FAISS_HNSW_M: int = 32
+    FAISS_HNSW_EF_CONSTRUCTION: int = 40
+    FAISS_HNSW_EF_SEARCH: int = 64  # search-time, applied on every load
+    FAISS_IVF_NLIST: int = 100  # clamped for small catalogs
+    FAISS_IVF_NPROBE: int = 8  # search-time, applied on every load
+    FAISS_PQ_M: int = 8  # sub-quantizers; must divide the embedding dimension
+    FAISS_PQ_NBITS: int = 8
+    FAISS_MMAP: bool = False  # Memory-map index.faiss read-only when serving, so uvicorn workers share its pages
+    EMBEDDING_BACKEND: str = "torch"  # "torch" (sentence-transformers) or "onnx" (ONNX Runtime, no torch import)
+    ONNX_MODEL_DIR: str = "models/multi-qa-MiniLM-L6-cos-v1-onnx"  # Created by: python -m rag.embeddings export
+    ONNX_MODEL_FILE: str = "model_quantized.onnx"  # or "model.onnx" for the fp32 export
+    ONNX_NUM_THREADS: int = 2  # intra-op threads per worker
+    QUERY_EMBEDDING_CACHE_SIZE: int = 4096  # Cached query vectors (0 disables the cache)
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: float = 3600.0
+    EMBEDDING_MICRO_BATCH_SIZE: int = 16  # Max queries per batched forward pass (1 disables micro-batching)
+    EMBEDDING_MICRO_BATCH_WAIT_MS: float = 2.0  # How long the first query waits for others to join its batch
     
     # Search Settings
     DEFAULT_SEARCH_K: int = 15  # Number of results to retrieve
     MAX_SIMILARITY_SCORE: float = 1.3  # Maximum similarity score threshold
     DEFAULT_QUERY_K: int = 5  # Default k for query_vector_store
+    FILTER_PUSHDOWN_ENABLED: bool = True  # Filter inside FAISS; False uses the adaptive over-fetch loop
+    ADAPTIVE_SEARCH_MAX_K: int = 240  # Upper bound for k while widening
+    ADAPTIVE_SEARCH_GROWTH: float = 2.0  # k multiplier per round
+    ADAPTIVE_SEARCH_OVERFETCH: float = 1.5  # Safety factor on the selectivity-based first k
+    ADAPTIVE_SEARCH_BUDGET_MS: float = 50.0  # Stop widening once this much time is spent
+    MAX_BATCH_QUERIES: int = 512  # Upper bound for /search/batch
+    RETRIEVAL_MODE: str = "vector"  # query_vector_store default: vector | hybrid (BM25 + vector, fused with RRF)
+    HYBRID_CANDIDATES: int = 50  # Candidates taken from each retriever before fusion
+    HYBRID_RRF_K: int = 60  # Reciprocal rank fusion constant: score = sum of 1 / (HYBRID_RRF_K + rank)
+    HYBRID_LEXICAL_MIN_COVERAGE: float = 1.0  # Skip embedding + FAISS when the top BM25 hit has this share of the query's (IDF-weighted) terms
+    SPECULATIVE_SEARCH_ENABLED: bool = True  # Search the raw query while intent analysis runs
+    SPECULATIVE_REUSE_MAX_COSINE_DISTANCE: float = 0.15  # Reuse raw-query results if intent query is this close
     
     # LLM Settings
     LLM_MODEL: str = "gpt-4o-mini"
     LLM_TEMPERATURE: float = 0.7
+    INTENT_LLM_MODEL: str = "gpt-4o-mini"  # Model for analyse_promt structured output
+    LLM_BASE_URL: Optional[str] = None  # Point at any OpenAI-compatible server
+    LLM_MAX_CONNECTIONS: int = 20  # Pooled HTTP connections per client
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_RETRIES: int = 2
+    
+    # Intent Cache Settings (independent of MAX_SIMILARITY_SCORE, which is a FAISS L2 score)
+    INTENT_CACHE_SIZE: int = 2048  # Cached analyse_promt results (0 disables the cache)
+    INTENT_CACHE_MAX_COSINE_DISTANCE: float = 0.05  # Near-match threshold between query embeddings
+    INTENT_CACHE_TTL_SECONDS: float = 86400.0
+    
+    # Rule-based Intent Settings
+    RULE_INTENT_ENABLED: bool = True  # Parse common query shapes locally before calling the intent LLM
+    RULE_INTENT_MIN_CONFIDENCE: float = 0.7  # Below this the LLM is asked instead
+    RULE_INTENT_MAX_QUERY_WORDS: int = 12  # Longer queries lower the rule confidence
+    RULE_INTENT_SPACY_MODEL: str = "en_core_web_sm"  # Noun chunks for product detection ("" disables spaCy)
+    
+    # Explanation Cache Settings
+    EXPLANATION_CACHE_SIZE: int = 4096  # Cached LLM explanations (0 disables the cache)
+    
+    # Response Cache Settings (whole API responses, keyed by catalog version and model settings)
+    RESPONSE_CACHE_SIZE: int = 2048  # Cached responses (0 disables the cache; ETags are still sent)
+    RESPONSE_CACHE_TTL_SECONDS: float = 300.0  # Fresh for this long (Cache-Control max-age)
+    RESPONSE_CACHE_STALE_SECONDS: float = 600.0  # Then served stale while refreshed in the background
     
     # Recommendation Settings
     MAX_RECOMMENDATIONS_TO_EXPLAIN: int = 3  # Top N products to explain
     MAX_RECOMMENDATIONS_TO_RETURN: int = 8  # Maximum recommendations to return
+    SINGLE_FLIGHT_ENABLED: bool = True  # Concurrent identical queries share one graph execution
+    RECOMMENDATION_MODE: str = "auto"  # Default request mode: fast (no LLM) | full (LLM graph) | auto (fast, escalate if unsure)
+    CASCADE_MIN_RESULTS: int = 3  # auto: escalate when the fast pipeline returns fewer recommendations
+    CASCADE_MAX_TOP_SCORE: float = 0.9  # auto: escalate when even the best match scores worse (L2, lower is better)
+    CASCADE_MIN_SCORE_SPREAD: float = 0.0  # auto: escalate when top results are this close to each other (0 disables)
+    
+    # Concurrency Settings
+    CPU_EXECUTOR_WORKERS: int = 4  # Threads for embedding/FAISS work off the event loop
     
     # API Settings
     API_TITLE: str = "Product Recommendation System API"
@@ -28,6 +92,7 @@ class Settings(BaseSettings):
     API_DESCRIPTION: str = "API for product recommendations using RAG"
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
+    LOG_LEVEL: str = "INFO"  # DEBUG shows per-request node progress
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,140 @@
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from config.settings import settings
+from rag.attribute_index import get_attribute_index
+from rag.candidates import SearchCandidates
+from rag.filters import SearchFilter
+from rag.query import search_rows
+from rag.vector_store_registry import resolve_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AdaptiveSearchResult:
+    candidates: SearchCandidates
+    rounds: int
+    final_k: int
+    selectivity: float
+
+
+class AdaptiveSearchStats:
+    """Aggregate round counts so k no longer needs hand-tuning per deployment"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.rounds = 0
+        self.max_rounds = 0
+        self.short_results = 0  # searches that ended below the target
+
+    def record(self, rounds: int, reached_target: bool) -> None:
+        with self._lock:
+            self.searches += 1
+            self.rounds += rounds
+            self.max_rounds = max(self.max_rounds, rounds)
+            if not reached_target:
+                self.short_results += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "searches": self.searches,
+                "rounds": self.rounds,
+                "mean_rounds": self.rounds / self.searches if self.searches else 0.0,
+                "max_rounds": self.max_rounds,
+                "short_results": self.short_results,
+            }
+
+
+adaptive_search_stats = AdaptiveSearchStats()
+
+
+def estimate_selectivity(search_filter: SearchFilter, vectorstore) -> float:
+    """Fraction of the catalog passing the filter, from the attribute arrays"""
+    keep = search_filter.mask(get_attribute_index(vectorstore))
+    return float(keep.mean()) if len(keep) else 0.0
+
+
+def adaptive_search(
+    query: str,
+    vectorstore,
+    search_filter: SearchFilter,
+    target: int,
+    max_score: Optional[float] = None,
+    max_k: Optional[int] = None,
+    growth: Optional[float] = None,
+    budget_ms: Optional[float] = None,
+) -> AdaptiveSearchResult:
+    """
+    Post-filtered search that widens k until enough results survive.
+    
+    The first k is sized from the filter's estimated selectivity; each further
+    round multiplies k by growth, stopping once target results pass max_score
+    and the filter, k reaches max_k (or the catalog size), the score threshold
+    cut the candidate list short, or the latency budget is spent.
+    Only the first round embeds the query; later rounds hit the query cache.
+    """
+    vectorstore = resolve_vector_store(vectorstore)
+    max_k = min(max_k or settings.ADAPTIVE_SEARCH_MAX_K, vectorstore.index.ntotal)
+    growth = growth or settings.ADAPTIVE_SEARCH_GROWTH
+    budget_ms = settings.ADAPTIVE_SEARCH_BUDGET_MS if budget_ms is None else budget_ms
+
+    selectivity = estimate_selectivity(search_filter, vectorstore)
+    if selectivity == 0.0 or max_k == 0:
+        adaptive_search_stats.record(0, reached_target=False)
+        empty = SearchCandidates(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), vectorstore)
+        return AdaptiveSearchResult(empty, rounds=0, final_k=0, selectivity=selectivity)
+
+    k = min(max_k, max(target, math.ceil(target / selectivity * settings.ADAPTIVE_SEARCH_OVERFETCH)))
+    attribute_index = get_attribute_index(vectorstore)
+    started = time.perf_counter()
+    rounds = 0
+    while True:
+        rounds += 1
+        row_ids, scores = search_rows(query, vectorstore, k, max_score=max_score)
+        survivors = SearchCandidates(row_ids, scores, vectorstore).select(
+            search_filter.mask(attribute_index, row_ids)
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        exhausted = len(row_ids) < k  # max_score already cut the list; a bigger k adds nothing
+        if len(survivors) >= target or k >= max_k or exhausted or elapsed_ms >= budget_ms:
+            break
+        k = min(max_k, math.ceil(k * growth))
+
+    adaptive_search_stats.record(rounds, reached_target=len(survivors) >= target)
+    logger.debug("   Adaptive search: %d results after %d round(s), k=%d", len(survivors), rounds, k)
+    return AdaptiveSearchResult(survivors, rounds=rounds, final_k=k, selectivity=selectivity)
+
+
+def filtered_search(
+    query: str,
+    vectorstore,
+    search_filter: Optional[SearchFilter],
+    k: int,
+    target: int,
+    max_score: Optional[float] = None,
+) -> SearchCandidates:
+    """
+    Search honouring search_filter: pushed down into FAISS when enabled,
+    otherwise with the adaptive over-fetch loop.
+    
+    Returns row-id candidates; callers materialize dicts with to_results().
+    """
+    vectorstore = resolve_vector_store(vectorstore)
+    logger.debug("Query: %r", query)
+    if search_filter is None or search_filter.is_empty():
+        return SearchCandidates(*search_rows(query, vectorstore, k, max_score=max_score), vectorstore)
+    if settings.FILTER_PUSHDOWN_ENABLED:
+        return SearchCandidates(
+            *search_rows(query, vectorstore, k, max_score=max_score, search_filter=search_filter),
+            vectorstore
+        )
+    return adaptive_search(query, vectorstore, search_filter, target=target, max_score=max_score).candidates
@@ -0,0 +1,177 @@
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+
+from config.settings import settings
+from rag.agent.recommendation_agent import build_recommendation_graph
+from rag.metrics import CASCADE_ESCALATIONS, CASCADE_REQUESTS
+from rag.price_patterns import mentions_money, parse_price_bounds
+from simple_rag.agent.simple_recommendation_agent import build_simple_recommendation_graph
+
+logger = logging.getLogger(__name__)
+
+MODES = ("fast", "full", "auto")
+
+
+class CascadeStats:
+    """How often auto mode had to fall back to the LLM pipeline"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.auto_requests = 0
+        self.escalations = 0
+
+    def record(self, escalated: bool) -> None:
+        with self._lock:
+            self.auto_requests += 1
+            if escalated:
+                self.escalations += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "auto_requests": self.auto_requests,
+                "escalations": self.escalations,
+                "escalation_rate": self.escalations / self.auto_requests if self.auto_requests else 0.0,
+            }
+
+
+cascade_stats = CascadeStats()
+
+
+def resolve_mode(mode: Optional[str]) -> str:
+    mode = mode or settings.RECOMMENDATION_MODE
+    if mode not in MODES:
+        raise ValueError(f"Unknown recommendation mode {mode!r}; expected one of {', '.join(MODES)}")
+    return mode
+
+
+def precheck_escalation(query: str) -> Optional[str]:
+    """Reason to skip the fast pipeline outright: money is mentioned but the regexes can't parse it"""
+    if mentions_money(query) and parse_price_bounds(query) == (None, None):
+        return "unparsed_price"
+    return None
+
+
+def assess_fast_result(state: Dict[str, Any]) -> Optional[str]:
+    """
+    Reason to escalate a finished fast-pipeline run, or None if it can be served.
+
+    Looks at the recommendation count and the FAISS score distribution of the
+    search candidates (L2 scores, best first).
+    """
+    if len(state["recommendations"]) < settings.CASCADE_MIN_RESULTS:
+        return "few_results"
+    candidates = state.get("search_candidates")
+    if candidates is None or not len(candidates):
+        return None
+    scores = candidates.scores[:settings.MAX_RECOMMENDATIONS_TO_RETURN]
+    if float(scores[0]) > settings.CASCADE_MAX_TOP_SCORE:
+        return "weak_match"
+    if len(scores) > 1 and float(scores[-1] - scores[0]) < settings.CASCADE_MIN_SCORE_SPREAD:
+        return "flat_scores"
+    return None
+
+
+def build_cascading_recommender(vectorstore, speculative=None):
+    """
+    Serve recommendations from the simple (no-LLM) pipeline, the full LLM graph, or both.
+
+    The returned run(query, mode) mirrors the graph builders (run.arun, run.astream):
+    - fast: simple_rag only
+    - full: build_recommendation_graph only
+    - auto: simple_rag first, escalating to the full graph when precheck_escalation
+      or assess_fast_result finds a reason
+    Responses carry "pipeline" ("fast" or "full") naming the pipeline that served them.
+    """
+    full = build_recommendation_graph(vectorstore, speculative=speculative)
+    fast = build_simple_recommendation_graph(vectorstore)
+
+    def _record(mode: str, pipeline: str, reason: Optional[str] = None) -> None:
+        CASCADE_REQUESTS.inc(mode=mode, pipeline=pipeline)
+        if mode == "auto":
+            cascade_stats.record(escalated=reason is not None)
+            if reason is not None:
+                CASCADE_ESCALATIONS.inc(reason=reason)
+                logger.debug("⤴️  Escalating to the LLM pipeline (%s)", reason)
+
+    def _judge(state) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        reason = assess_fast_result(state)
+        if reason is not None:
+            return None, reason
+        return state["formatted_response"] or {}, None
+
+    def _fast_or_escalate(query: str, config) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """(fast response, None) when auto mode can serve it, else (None, escalation reason)"""
+        reason = precheck_escalation(query)
+        if reason is not None:
+            return None, reason
+        return _judge(fast.run_state(query, config=config))
+
+    async def _afast_or_escalate(query: str, config) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        reason = precheck_escalation(query)
+        if reason is not None:
+            return None, reason
+        return _judge(await fast.arun_state(query, config=config))
+
+    def run(query: str, mode: Optional[str] = None, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        """Execute the cascade with a query; mode defaults to RECOMMENDATION_MODE"""
+        mode = resolve_mode(mode)
+        if mode == "fast":
+            _record(mode, "fast")
+            return {**fast(query, config=config), "pipeline": "fast"}
+        if mode == "auto":
+            response, reason = _fast_or_escalate(query, config)
+            if response is not None:
+                _record(mode, "fast")
+                return {**response, "pipeline": "fast"}
+            _record(mode, "full", reason)
+        else:
+            _record(mode, "full")
+        return {**full(query, config=config), "pipeline": "full"}
+
+    async def arun(query: str, mode: Optional[str] = None, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        """Execute the cascade without blocking the event loop"""
+        mode = resolve_mode(mode)
+        if mode == "fast":
+            _record(mode, "fast")
+            return {**(await fast.arun(query, config=config)), "pipeline": "fast"}
+        if mode == "auto":
+            response, reason = await _afast_or_escalate(query, config)
+            if response is not None:
+                _record(mode, "fast")
+                return {**response, "pipeline": "fast"}
+            _record(mode, "full", reason)
+        else:
+            _record(mode, "full")
+        return {**(await full.arun(query, config=config)), "pipeline": "full"}
+
+    async def astream(query: str, mode: Optional[str] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Same events as the full graph's astream. A fast-pipeline answer is sent as
+        "recommendations", one "explanation_delta" with the whole explanation, then "done".
+        """
+        mode = resolve_mode(mode)
+        response = None
+        if mode == "fast":
+            response = await fast.arun(query)
+            _record(mode, "fast")
+        elif mode == "auto":
+            response, reason = await _afast_or_escalate(query, None)
+            _record(mode, "fast" if response is not None else "full", reason)
+        else:
+            _record(mode, "full")
+
+        if response is not None:
+            yield "recommendations", response.get("recommendations", [])
+            yield "explanation_delta", response.get("explanation", "")
+            yield "done", {**response, "pipeline": "fast"}
+            return
+        async for event, data in full.astream(query):
+            yield event, ({**data, "pipeline": "full"} if event == "done" else data)
+
+    run.arun = arun
+    run.astream = astream
+    return run
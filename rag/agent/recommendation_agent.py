@@ -1,51 +1,153 @@
-from typing import Dict, Any
-from functools import partial
+from typing import Dict, Any, Optional, AsyncIterator, Tuple
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 
 from rag.agent.state import AgentState
+from rag.agent.runnables import graph_node
+from rag.cache import normalize_query
+from rag.single_flight import SingleFlight
+from config.settings import settings
 from rag.nodes import (
     analyze_intent_node,
+    aanalyze_intent_node,
+    speculative_search_node,
+    aspeculative_search_node,
     search_products_node,
+    asearch_products_node,
     refine_results_node,
     explain_recommendations_node,
+    aexplain_recommendations_node,
+    astream_explanation,
     format_response_node,
 )
 
 
-def build_recommendation_graph(vectorstore):
-    """Build the workflow graph and return a function that accepts queries"""
-    workflow = StateGraph(AgentState)
-    
-    # Add nodes
-    workflow.add_node("analyze", analyze_intent_node)
-    workflow.add_node("search", partial(search_products_node, vectorstore=vectorstore))
-    workflow.add_node("refine", refine_results_node)
-    workflow.add_node("explain", explain_recommendations_node)
-    workflow.add_node("format", format_response_node)
+def _initial_state(query: str) -> AgentState:
+    return {
+        "query": query,
+        "analyzed_intent": None,
+        "search_results": [],
+        "search_candidates": None,
+        "speculative_candidates": None,
+        "recommendations": [],
+        "explanation": "",
+        "formatted_response": None
+    }
+
+
+def _add_retrieval_nodes(workflow: StateGraph, vectorstore, speculative: bool) -> None:
+    """Add analyze -> search -> refine (plus the speculative branch) to workflow"""
+    # Add nodes (sync implementation for invoke, async one for ainvoke)
+    workflow.add_node(
+        "analyze",
+        graph_node(analyze_intent_node, aanalyze_intent_node, vectorstore=vectorstore)
+    )
+    workflow.add_node(
+        "search",
+        graph_node(search_products_node, asearch_products_node, vectorstore=vectorstore)
+    )
+    workflow.add_node("refine", graph_node(refine_results_node))
     
     # Connect nodes
     workflow.add_edge(START, "analyze")
-    workflow.add_edge("analyze", "search")
+    if speculative:
+        workflow.add_node(
+            "speculate",
+            graph_node(speculative_search_node, aspeculative_search_node, vectorstore=vectorstore)
+        )
+        workflow.add_edge(START, "speculate")
+        # Fan-in: search waits for both the intent and the speculative results
+        workflow.add_edge(["analyze", "speculate"], "search")
+    else:
+        workflow.add_edge("analyze", "search")
     workflow.add_edge("search", "refine")
+
+
+def build_recommendation_graph(vectorstore, speculative=None):
+    """
+    Build the workflow graph and return a function that accepts queries.
+    
+    vectorstore may be a FAISS store or a VectorStoreRegistry; with a registry
+    every search borrows whichever index is live at that moment.
+    
+    The returned run() is synchronous; run.arun() is the async equivalent that
+    awaits the LLM calls and offloads embedding/FAISS work to the CPU pool.
+    run.astream() yields progress events for streaming clients.
+    
+    With SINGLE_FLIGHT_ENABLED, concurrent run()/run.arun() calls for the same
+    normalized query share one graph execution (and its result); streams aren't
+    coalesced.
+    
+    In speculative mode (default: SPECULATIVE_SEARCH_ENABLED) the raw query is
+    searched in parallel with intent analysis, and "search" reuses those results
+    when the intent's product query embeds close to the raw query.
+    """
+    if speculative is None:
+        speculative = settings.SPECULATIVE_SEARCH_ENABLED
+    
+    workflow = StateGraph(AgentState)
+    _add_retrieval_nodes(workflow, vectorstore, speculative)
+    workflow.add_node("explain", graph_node(explain_recommendations_node, aexplain_recommendations_node))
+    workflow.add_node("format", graph_node(format_response_node))
     workflow.add_edge("refine", "explain")
     workflow.add_edge("explain", "format")
     workflow.add_edge("format", END)
     
     compiled_graph = workflow.compile()
     
-    # Return a function that handles state creation and execution
-    def run(query: str) -> Dict[str, Any]:
-        """Execute the recommendation graph with a query"""
-        state: AgentState = {
-            "query": query,
-            "analyzed_intent": None,
-            "search_results": [],
-            "recommendations": [],
-            "explanation": "",
-            "formatted_response": None
-        }
-        final_state = compiled_graph.invoke(state)
+    # Streaming stops after refine; the explanation is streamed token by token
+    retrieval_workflow = StateGraph(AgentState)
+    _add_retrieval_nodes(retrieval_workflow, vectorstore, speculative)
+    retrieval_workflow.add_edge("refine", END)
+    retrieval_graph = retrieval_workflow.compile()
+    
+    flight = SingleFlight("recommendation_graph") if settings.SINGLE_FLIGHT_ENABLED else None
+    
+    def _invoke(query: str, config: Optional[RunnableConfig]) -> Dict[str, Any]:
+        final_state = compiled_graph.invoke(_initial_state(query), config=config)
+        return final_state["formatted_response"] or {}
+    
+    async def _ainvoke(query: str, config: Optional[RunnableConfig]) -> Dict[str, Any]:
+        final_state = await compiled_graph.ainvoke(_initial_state(query), config=config)
         return final_state["formatted_response"] or {}
     
+    # Return a function that handles state creation and execution
+    def run(query: str, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        """Execute the recommendation graph with a query (config: e.g. callbacks; a coalesced call uses the leader's)"""
+        if flight is None:
+            return _invoke(query, config)
+        return flight.do(normalize_query(query), lambda: _invoke(query, config))
+    
+    async def arun(query: str, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        """Execute the recommendation graph without blocking the event loop"""
+        if flight is None:
+            return await _ainvoke(query, config)
+        return await flight.ado(normalize_query(query), lambda: _ainvoke(query, config))
+    
+    async def astream(query: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Yield (event, data) pairs as the pipeline progresses:
+        "intent" once analysis finishes, "recommendations" after refinement,
+        "explanation_delta" per streamed token chunk, then "done" with the full response.
+        """
+        state = _initial_state(query)
+        async for update in retrieval_graph.astream(state, stream_mode="updates"):
+            for node_name, node_update in update.items():
+                state.update(node_update or {})
+                if node_name == "analyze" and state["analyzed_intent"] is not None:
+                    yield "intent", state["analyzed_intent"].model_dump()
+                elif node_name == "refine":
+                    yield "recommendations", state["recommendations"]
+        
+        parts = []
+        async for delta in astream_explanation(query, state["recommendations"]):
+            parts.append(delta)
+            yield "explanation_delta", delta
+        
+        state["explanation"] = "".join(parts).strip()
+        state = format_response_node(state)
+        yield "done", state["formatted_response"]
+    
+    run.arun = arun
+    run.astream = astream
     return run
-
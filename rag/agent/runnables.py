@@ -0,0 +1,46 @@
+import time
+from functools import partial
+from typing import Callable, Optional
+
+from langchain_core.runnables import RunnableLambda
+
+from rag.metrics import NODE_LATENCY
+
+
+def _timed(func: Callable, name: str) -> Callable:
+    def timed(state):
+        start = time.perf_counter()
+        try:
+            return func(state)
+        finally:
+            NODE_LATENCY.observe(time.perf_counter() - start, node=name)
+    return timed
+
+
+def _atimed(afunc: Callable, name: str) -> Callable:
+    async def atimed(state):
+        start = time.perf_counter()
+        try:
+            return await afunc(state)
+        finally:
+            NODE_LATENCY.observe(time.perf_counter() - start, node=name)
+    return atimed
+
+
+def graph_node(func: Callable, afunc: Optional[Callable] = None, **bound) -> RunnableLambda:
+    """
+    Wrap a node so the compiled graph runs func under invoke() and afunc under ainvoke().
+    
+    Keyword arguments (e.g. vectorstore) are bound to both implementations.
+    Without afunc, ainvoke() runs func in a worker thread.
+    Every call is recorded in the rag_node_duration_seconds histogram.
+    """
+    name = func.__name__
+    if bound:
+        func = partial(func, **bound)
+        afunc = partial(afunc, **bound) if afunc else None
+    return RunnableLambda(
+        _timed(func, name),
+        afunc=_atimed(afunc, name) if afunc else None,
+        name=name,
+    )
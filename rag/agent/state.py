@@ -1,5 +1,6 @@
 from typing import TypedDict, List, Dict, Any, Optional
 from rag.analazye_promt import understand_promt
+from rag.candidates import SearchCandidates
 
 
 class AgentState(TypedDict):
@@ -7,6 +8,8 @@ class AgentState(TypedDict):
     query: str
     analyzed_intent: Optional[understand_promt]
     search_results: List[Dict[str, Any]]
+    search_candidates: Optional[SearchCandidates]  # Row ids + scores; refine materializes the survivors
+    speculative_candidates: Optional[SearchCandidates]  # Raw-query search run alongside intent analysis
     recommendations: List[Dict[str, Any]]
     explanation: str
     formatted_response: Optional[Dict[str, Any]]
@@ -1,8 +1,11 @@
-from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, List
+import logging
 import os
 from dotenv import load_dotenv
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
@@ -23,13 +26,122 @@ class understand_promt(BaseModel):
     product: str = Field(description="The product that the user is searching for")
 
 
-def analyse_promt(queryString):
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+_intent_cache = None
+
+
+def _embed_for_intent_cache(text):
+    """Embed with the live registry's model; None disables the near-match tier"""
+    from rag.vector_store_registry import get_vector_store_registry
+
+    registry = get_vector_store_registry()
+    if registry is None or not registry.is_loaded:
+        return None
+    return registry.embeddings.embed_query(text)
+
+
+def get_intent_cache():
+    """Process-wide semantic intent cache (None when INTENT_CACHE_SIZE is 0)"""
+    global _intent_cache
+    if _intent_cache is None and settings.INTENT_CACHE_SIZE > 0:
+        from rag.intent_cache import SemanticIntentCache
+
+        _intent_cache = SemanticIntentCache(
+            max_size=settings.INTENT_CACHE_SIZE,
+            max_cosine_distance=settings.INTENT_CACHE_MAX_COSINE_DISTANCE,
+            ttl_seconds=settings.INTENT_CACHE_TTL_SECONDS,
+            embed_fn=_embed_for_intent_cache,
+        )
+    return _intent_cache
+
+
+def _rule_intent(queryString, vectorstore=None):
+    """
+    understand_promt from rag.rule_intent when it is confident enough, else None.
+    
+    The gazetteer comes from vectorstore (a store or registry), or the live registry's store when not given.
+    """
+    if not settings.RULE_INTENT_ENABLED:
+        return None
+    from rag.gazetteer import get_gazetteer
+    from rag.rule_intent import extract_intent
+    from rag.vector_store_registry import get_vector_store_registry, resolve_vector_store
+
+    if vectorstore is None:
+        registry = get_vector_store_registry()
+        if registry is not None and registry.is_loaded:
+            vectorstore = registry.vectorstore
+    else:
+        vectorstore = resolve_vector_store(vectorstore)
+    gazetteer = get_gazetteer(vectorstore) if vectorstore is not None else None
+    result = extract_intent(queryString, gazetteer)
+    if result.confidence < settings.RULE_INTENT_MIN_CONFIDENCE:
+        logger.debug("🔍 Rule intent not confident (%.2f, %s), asking the LLM", result.confidence, result.signals)
+        return None
+    return result.intent
+
+
+def _build_intent_prompt(queryString):
+    return "can you get the intension of the following query: " + queryString
+
+
+def analyse_promt(queryString, vectorstore=None):
+    from rag.metrics import INTENT_SOURCE
+
+    ruled = _rule_intent(queryString, vectorstore)
+    if ruled is not None:
+        INTENT_SOURCE.inc(source="rules")
+        logger.debug("🔍 Analyse Promt (rules): %s", ruled)
+        return ruled
+
+    cache = get_intent_cache()
+    if cache is not None:
+        cached = cache.lookup(queryString)
+        if cached is not None:
+            INTENT_SOURCE.inc(source="cache")
+            logger.debug("🔍 Analyse Promt (cached): %s", cached)
+            return cached
+
+    from rag.llm_clients import get_llm_client_pool
+
+    response = get_llm_client_pool().intent_runnable.invoke(
+        _build_intent_prompt(queryString)
+    )
+    INTENT_SOURCE.inc(source="llm")
+    logger.debug("🔍 Analyse Promt Response: %s", response)
+
+    if cache is not None:
+        cache.store(queryString, response)
+    return response
+
+
+async def aanalyse_promt(queryString, vectorstore=None):
+    """Async variant of analyse_promt - awaits the LLM instead of blocking the event loop"""
+    from rag.executors import run_cpu_bound
+    from rag.metrics import INTENT_SOURCE
+
+    ruled = await run_cpu_bound(_rule_intent, queryString, vectorstore)
+    if ruled is not None:
+        INTENT_SOURCE.inc(source="rules")
+        logger.debug("🔍 Analyse Promt (rules): %s", ruled)
+        return ruled
+
+    cache = get_intent_cache()
+    if cache is not None:
+        # Near-tier lookups embed the query, so keep them off the event loop
+        cached = await run_cpu_bound(cache.lookup, queryString)
+        if cached is not None:
+            INTENT_SOURCE.inc(source="cache")
+            logger.debug("🔍 Analyse Promt (cached): %s", cached)
+            return cached
+
+    from rag.llm_clients import get_llm_client_pool
 
-    response = llm.with_structured_output(understand_promt).invoke(
-        "can you get the intension of the following query: "
-        + queryString
+    response = await get_llm_client_pool().intent_runnable.ainvoke(
+        _build_intent_prompt(queryString)
     )
-    print(f"🔍 Analyse Promt Response: {response}")
+    INTENT_SOURCE.inc(source="llm")
+    logger.debug("🔍 Analyse Promt Response: %s", response)
 
+    if cache is not None:
+        await run_cpu_bound(cache.store, queryString, response)
     return response
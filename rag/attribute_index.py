@@ -0,0 +1,137 @@
+import json
+import weakref
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from rag.metadata_store import get_metadata_store, iter_metadata_records
+
+ATTRIBUTES_FILE = "attributes.npz"
+CODED_FIELDS = ("category", "type", "brand")
+
+
+def _encode_strings(values: Sequence[Optional[str]]):
+    """Integer-code lower-cased strings; returns (codes, vocabulary)"""
+    normalized = [(v or "").lower() for v in values]
+    vocabulary, codes = np.unique(np.array(normalized, dtype=object), return_inverse=True)
+    return codes.astype(np.int32), [str(v) for v in vocabulary]
+
+
+class AttributeIndex:
+    """
+    Dense per-row product attributes aligned with FAISS row ids.
+    
+    price/rating/stock are float arrays and category/type/brand are integer
+    codes, so structured predicates (search filters, refine stages) run as one
+    vectorized expression instead of per result dict.
+    """
+
+    def __init__(
+        self,
+        price: np.ndarray,
+        rating: np.ndarray,
+        stock: np.ndarray,
+        codes: Dict[str, np.ndarray],
+        vocabularies: Dict[str, List[str]],
+    ):
+        self.price = price
+        self.rating = rating
+        self.stock = stock
+        self.codes = codes
+        self.vocabularies = vocabularies
+        self._lookups = {
+            field: {name: code for code, name in enumerate(vocabulary)}
+            for field, vocabulary in vocabularies.items()
+        }
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.price)
+
+    @property
+    def category_codes(self) -> np.ndarray:
+        return self.codes["category"]
+
+    def code(self, field: str, value: str) -> Optional[int]:
+        return self._lookups[field].get(value.lower())
+
+    def category_code(self, category: str) -> Optional[int]:
+        return self.code("category", category)
+
+    @classmethod
+    def from_records(cls, records: Sequence[dict]) -> "AttributeIndex":
+        # Missing numbers count as 0, matching refine_results_node's result.get("price", 0)
+        def numeric(name):
+            return np.array([r.get(name) or 0 for r in records], dtype=np.float64)
+
+        codes, vocabularies = {}, {}
+        for field in CODED_FIELDS:
+            codes[field], vocabularies[field] = _encode_strings([r.get(field) for r in records])
+        return cls(numeric("price"), numeric("rating"), numeric("stock"), codes, vocabularies)
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore) -> "AttributeIndex":
+        metadata_store = get_metadata_store(vectorstore)
+        if metadata_store is not None:
+            return cls.from_metadata_store(metadata_store)
+        return cls.from_records(list(iter_metadata_records(vectorstore)))
+
+    @classmethod
+    def from_metadata_store(cls, metadata_store) -> "AttributeIndex":
+        def numeric(name):
+            if name not in metadata_store.numeric:
+                return np.zeros(len(metadata_store), dtype=np.float64)
+            values = np.asarray(metadata_store.numeric[name], dtype=np.float64)
+            present = metadata_store.present.get(name)
+            return np.where(present, values, 0.0) if present is not None else values
+
+        codes, vocabularies = {}, {}
+        for field in CODED_FIELDS:
+            values = [
+                metadata_store.value(field, row) if field in metadata_store.strings else None
+                for row in range(len(metadata_store))
+            ]
+            codes[field], vocabularies[field] = _encode_strings(values)
+        return cls(numeric("price"), numeric("rating"), numeric("stock"), codes, vocabularies)
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            price=self.price,
+            rating=self.rating,
+            stock=self.stock,
+            vocabularies=np.array(json.dumps(self.vocabularies)),
+            **{f"{field}_codes": codes for field, codes in self.codes.items()},
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "AttributeIndex":
+        with np.load(path) as data:
+            vocabularies = json.loads(str(data["vocabularies"]))
+            codes = {field: data[f"{field}_codes"] for field in vocabularies}
+            return cls(data["price"], data["rating"], data["stock"], codes, vocabularies)
+
+
+_attribute_indexes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _load_persisted(vectorstore) -> Optional[AttributeIndex]:
+    """attributes.npz written at ingest, found next to the columnar metadata store"""
+    metadata_store = get_metadata_store(vectorstore)
+    if metadata_store is None:
+        return None
+    path = Path(metadata_store.path).parent / ATTRIBUTES_FILE
+    if not path.exists():
+        return None
+    attribute_index = AttributeIndex.load(path)
+    return attribute_index if attribute_index.num_rows == vectorstore.index.ntotal else None
+
+
+def get_attribute_index(vectorstore) -> AttributeIndex:
+    """Attribute index for vectorstore: loaded from ingest output, else built once per store"""
+    attribute_index = _attribute_indexes.get(vectorstore)
+    if attribute_index is None or attribute_index.num_rows != vectorstore.index.ntotal:
+        attribute_index = _load_persisted(vectorstore) or AttributeIndex.from_vectorstore(vectorstore)
+        _attribute_indexes[vectorstore] = attribute_index
+    return attribute_index
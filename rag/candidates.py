@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from rag.metadata_store import get_metadata_store
+
+
+@dataclass
+class SearchCandidates:
+    """
+    Search hits as FAISS row ids + scores, before any result dict is built.
+    
+    Refine stages filter these with vectorized masks over the attribute index
+    and only call to_results() for the survivors.
+    """
+    row_ids: np.ndarray
+    scores: np.ndarray
+    vectorstore: Any  # the store the row ids belong to (pinned for the whole request)
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+    def select(self, keep: np.ndarray) -> "SearchCandidates":
+        return SearchCandidates(self.row_ids[keep], self.scores[keep], self.vectorstore)
+
+    def head(self, n: int) -> "SearchCandidates":
+        return SearchCandidates(self.row_ids[:n], self.scores[:n], self.vectorstore)
+
+    def to_results(self, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Materialize result dicts (same shape as query_vector_store output)"""
+        metadata_store = get_metadata_store(self.vectorstore)
+        if metadata_store is not None:
+            from rag.format_data import format_row_results
+            return format_row_results(metadata_store, self.row_ids, self.scores, fields=fields)
+
+        from rag.format_data import format_search_results
+        docstore, mapping = self.vectorstore.docstore, self.vectorstore.index_to_docstore_id
+        return format_search_results([
+            (docstore.search(mapping[int(row)]), float(score))
+            for row, score in zip(self.row_ids, self.scores)
+        ])
@@ -1,29 +1,185 @@
 from __future__ import annotations
 
+import logging
 from pathlib import Path
 from typing import Optional
 
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
 from config.settings import settings
+from rag.index_factory import IndexSpec, apply_search_params, build_index, read_index
+
+logger = logging.getLogger(__name__)
+
+
+def create_embeddings() -> Embeddings:
+    """
+    Create the embedding model used to build and query the vectorstore.
+    The backend (torch or onnx) comes from EMBEDDING_BACKEND; concurrent
+    query embeddings are micro-batched unless EMBEDDING_MICRO_BATCH_SIZE is 1,
+    and query vectors are memoized unless QUERY_EMBEDDING_CACHE_SIZE is 0.
+    """
+    from rag.embeddings import create_base_embeddings
+    embeddings = create_base_embeddings()
+    if settings.EMBEDDING_MICRO_BATCH_SIZE > 1:
+        from rag.embedding_batcher import MicroBatchingEmbeddings
+        embeddings = MicroBatchingEmbeddings(
+            embeddings,
+            max_batch_size=settings.EMBEDDING_MICRO_BATCH_SIZE,
+            max_wait_ms=settings.EMBEDDING_MICRO_BATCH_WAIT_MS
+        )
+    if settings.QUERY_EMBEDDING_CACHE_SIZE <= 0:
+        return embeddings
+    
+    from rag.embedding_cache import CachedQueryEmbeddings
+    return CachedQueryEmbeddings(
+        embeddings,
+        model_name=f"{settings.EMBEDDING_BACKEND}:{settings.EMBEDDING_MODEL}",
+        max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+    )
+
+
+def build_vector_store(documents, embeddings: Embeddings, index_spec: IndexSpec) -> FAISS:
+    """Embed documents and build a FAISS store on the index type described by index_spec"""
+    import uuid
+    import numpy as np
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    
+    vectors = np.asarray(
+        embeddings.embed_documents([doc.page_content for doc in documents]),
+        dtype=np.float32
+    )
+    index = build_index(vectors, index_spec)
+    docstore_ids = [str(uuid.uuid4()) for _ in documents]
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(dict(zip(docstore_ids, documents))),
+        index_to_docstore_id=dict(enumerate(docstore_ids)),
+    )
+
+
+def save_vector_store(vectorstore: FAISS, faiss_path: Path) -> None:
+    """
+    Save index.faiss/index.pkl plus the columnar metadata store, attribute index,
+    gazetteer and BM25 index next to them.
+    
+    index.faiss/index.pkl are written to a staging directory and renamed into place,
+    so workers serving a memory-mapped index.faiss (FAISS_MMAP) keep reading valid data.
+    """
+    import os
+    import shutil
+    import tempfile
+    from rag.attribute_index import ATTRIBUTES_FILE, AttributeIndex
+    from rag.gazetteer import GAZETTEER_FILE, Gazetteer
+    from rag.lexical_index import LEXICAL_FILE, BM25Index
+    
+    staging_path = Path(tempfile.mkdtemp(prefix=".staging-", dir=faiss_path))
+    try:
+        vectorstore.save_local(str(staging_path))
+        for file_name in ("index.faiss", "index.pkl"):
+            os.replace(staging_path / file_name, faiss_path / file_name)
+    finally:
+        shutil.rmtree(staging_path, ignore_errors=True)
+    write_vector_store_metadata(vectorstore, faiss_path)
+    AttributeIndex.from_vectorstore(vectorstore).save(faiss_path / ATTRIBUTES_FILE)
+    Gazetteer.from_vectorstore(vectorstore).save(faiss_path / GAZETTEER_FILE)
+    BM25Index.from_vectorstore(vectorstore).save(faiss_path / LEXICAL_FILE)
+
+
+def write_vector_store_metadata(vectorstore: FAISS, faiss_path: Path) -> None:
+    """
+    (Re)write the columnar metadata store in FAISS row order.
+    
+    The new store is written to a temporary directory and renamed into place, so
+    processes that still have the old files memory-mapped keep reading valid data.
+    """
+    import shutil
+    import time
+    from rag.metadata_store import METADATA_DIR, write_metadata_store
+    
+    documents = [
+        vectorstore.docstore.search(vectorstore.index_to_docstore_id[row])
+        for row in range(vectorstore.index.ntotal)
+    ]
+    stamp = f"{time.time_ns()}"
+    metadata_path = faiss_path / METADATA_DIR
+    staging_path = faiss_path / f"{METADATA_DIR}.tmp-{stamp}"
+    write_metadata_store(documents, staging_path)
+    
+    old_path = faiss_path / f"{METADATA_DIR}.old-{stamp}"
+    if metadata_path.exists():
+        metadata_path.rename(old_path)
+    staging_path.rename(metadata_path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def _load_columnar_vector_store(faiss_path: Path, embeddings: Embeddings, mmap: bool = False) -> FAISS:
+    """Load index.faiss (memory-mapped if mmap) with the memory-mapped columnar store instead of unpickling index.pkl"""
+    from rag.metadata_store import (
+        METADATA_DIR,
+        ColumnarDocstore,
+        ColumnarMetadataStore,
+        RowIdMapping,
+    )
+    
+    metadata_path = faiss_path / METADATA_DIR
+    index = read_index(faiss_path / "index.faiss", mmap=mmap)
+    if (
+        not ColumnarMetadataStore.exists(metadata_path)
+        or len(ColumnarMetadataStore(metadata_path)) != index.ntotal
+    ):
+        # One-off migration for stores saved before the columnar format existed
+        logger.info("🗂️  Building columnar metadata store from index.pkl...")
+        pickled = FAISS.load_local(
+            str(faiss_path),
+            embeddings,
+            allow_dangerous_deserialization=True
+        )
+        write_vector_store_metadata(pickled, faiss_path)
+    
+    metadata_store = ColumnarMetadataStore(metadata_path)
+    logger.info("✅ Loaded vectorstore with columnar metadata (%d rows) from: %s", len(metadata_store), faiss_path)
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=ColumnarDocstore(metadata_store),
+        index_to_docstore_id=RowIdMapping(len(metadata_store)),
+    )
 
 
 def create_load_vector_store(
     name: Optional[str] = None,
-    products_path: Optional[Path] = None
+    products_path: Optional[Path] = None,
+    embeddings: Optional[Embeddings] = None,
+    writable: bool = False,
+    index_spec: Optional[IndexSpec] = None
 ) -> FAISS:
     """
     Create or load a FAISS vector store from product documents.
     If the vectorstore already exists, loads and returns it.
     If it doesn't exist, loads products from products_path and creates it.
+    Pass an already-loaded embeddings model to avoid constructing a new one.
+    
+    With METADATA_BACKEND="columnar" the returned store reads metadata from the
+    read-only, memory-mapped columnar store; pass writable=True to get the
+    pickled docstore instead (needed to add/delete documents). With FAISS_MMAP
+    the index itself is memory-mapped read-only too, unless writable.
+    
+    index_spec (default: the FAISS_* settings) picks Flat/HNSW/IVF/IVF-PQ when
+    building; its search-time parameters (efSearch, nprobe) are applied on load too.
     """
+    use_columnar = settings.METADATA_BACKEND == "columnar" and not writable
+    use_mmap = settings.FAISS_MMAP and not writable
+    if index_spec is None:
+        index_spec = IndexSpec.from_settings()
     # Use config default if name not provided
     if name is None:
         name = settings.VECTOR_STORE_NAME
     
-    embeddings = HuggingFaceEmbeddings(
-        model_name=settings.EMBEDDING_MODEL
-    )
+    if embeddings is None:
+        embeddings = create_embeddings()
 
     project_root = (Path(__file__).parent.parent)
     faiss_path = project_root / name
@@ -34,13 +190,19 @@ def create_load_vector_store(
     index_pkl = faiss_path / "index.pkl"
     
     if index_faiss.exists() and index_pkl.exists():
-        print("📂 Loading existing vectorstore from disk...")
-        vectorstore = FAISS.load_local(
-            str(faiss_path),
-            embeddings,
-            allow_dangerous_deserialization=True
-        )
-        print(f"✅ Loaded existing vectorstore from: {faiss_path}")
+        if use_columnar:
+            vectorstore = _load_columnar_vector_store(faiss_path, embeddings, mmap=use_mmap)
+        else:
+            logger.info("📂 Loading existing vectorstore from disk...")
+            vectorstore = FAISS.load_local(
+                str(faiss_path),
+                embeddings,
+                allow_dangerous_deserialization=True
+            )
+            if use_mmap:
+                vectorstore.index = read_index(index_faiss, mmap=True)
+            logger.info("✅ Loaded existing vectorstore from: %s", faiss_path)
+        apply_search_params(vectorstore.index, index_spec)
         return vectorstore
 
     # If vectorstore doesn't exist, load products and create documents
@@ -50,18 +212,23 @@ def create_load_vector_store(
             f"Please provide a valid products_path to create a new vectorstore."
         )
 
-    print(f"📂 Vectorstore doesn't exist. Loading products from {products_path}...")
-    from load_products import load_products
-    from ingest import create_documents
+    logger.info("📂 Vectorstore doesn't exist. Loading products from %s...", products_path)
+    from rag.load_products import load_products
+    from rag.ingest import create_documents
+    from rag.index_maintenance import build_manifest, save_manifest
     
     products = load_products(products_path)
     documents = create_documents(products)
 
-    # Create the vectorstore from documents
-    vectorstore = FAISS.from_documents(documents=documents, embedding=embeddings)
-    vectorstore.save_local(str(faiss_path))
+    # Create the vectorstore from documents (training the index on the product vectors)
+    vectorstore = build_vector_store(documents, embeddings, index_spec)
+    save_vector_store(vectorstore, faiss_path)
+    save_manifest(faiss_path, build_manifest(vectorstore))
 
-    print(f"✅ Created FAISS index with {len(documents)} chunks")
-    print(f"📁 Saved to: {faiss_path}")
+    logger.info("✅ Created %s FAISS index with %d chunks", index_spec.fitted_to(len(documents)).label(), len(documents))
+    logger.info("📁 Saved to: %s", faiss_path)
 
+    if use_columnar:
+        vectorstore = _load_columnar_vector_store(faiss_path, embeddings, mmap=use_mmap)
+        apply_search_params(vectorstore.index, index_spec)
     return vectorstore
\ No newline at end of file
@@ -0,0 +1,93 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from rag.metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatchingEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that coalesces concurrent embed_query() calls.
+
+    A single consumer thread collects queued queries for up to max_wait_ms after
+    the first one arrives (or until max_batch_size are waiting), embeds them in
+    one embed_documents() forward pass and hands each caller its vector. Only one
+    forward pass runs at a time, so concurrent requests stop contending for the
+    model's threads. Sits below CachedQueryEmbeddings, so cache hits never wait.
+    Document embedding (index builds) is passed through unbatched.
+    """
+
+    def __init__(self, embeddings: Embeddings, max_batch_size: int = 16, max_wait_ms: float = 2.0):
+        self.embeddings = embeddings
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue[Tuple[str, Future, float]]" = queue.Queue()
+        self._consumer = None
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        self._ensure_consumer()
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future.result()
+
+    def _consumer_running(self) -> bool:
+        return self._consumer is not None and self._consumer.is_alive()
+
+    def _ensure_consumer(self) -> None:
+        # Restarted if it ever died, so queued callers are never stranded
+        if not self._consumer_running():
+            with self._lock:
+                if not self._consumer_running():
+                    self._consumer = threading.Thread(
+                        target=self._run, name="embedding-micro-batcher", daemon=True
+                    )
+                    self._consumer.start()
+
+    def _collect(self) -> List[Tuple[str, Future, float]]:
+        """Block for the first query, then gather more until the window closes or the batch is full"""
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                self._embed_batch(batch)
+            except Exception as e:
+                # Any failure, including in result distribution, resolves every waiting caller
+                logger.warning("⚠️  Batched query embedding failed (%d queries): %s", len(batch), e)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _embed_batch(self, batch: List[Tuple[str, Future, float]]) -> None:
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            EMBEDDING_QUEUE_WAIT.observe(started - enqueued)
+        # Identical in-flight queries share one row of the forward pass
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+        EMBEDDING_BATCH_SIZE.observe(len(texts))
+        vectors = self.embeddings.embed_documents(texts)
+        if len(vectors) != len(texts):
+            raise ValueError(f"expected {len(texts)} embeddings, got {len(vectors)}")
+        vectors = dict(zip(texts, vectors))
+        for text, future, _ in batch:
+            future.set_result(list(vectors[text]))
@@ -0,0 +1,38 @@
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from rag.cache import LRUTTLCache, normalize_query
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that memoizes query vectors.
+    
+    Sits between the vectorstore and the embedding model, so every
+    query_vector_store() call benefits without changes at the call site.
+    Document embedding (index builds) is passed through uncached.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        max_size: int,
+        ttl_seconds: Optional[float] = None,
+    ):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = LRUTTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        normalized = normalize_query(text)
+        key = (self.model_name, normalized)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(normalized)
+            self.cache.set(key, vector)
+        return list(vector)
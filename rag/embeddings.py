@@ -0,0 +1,152 @@
+"""
+Embedding backends.
+
+"torch" uses HuggingFaceEmbeddings (sentence-transformers); "onnx" runs an
+exported copy of the same model with ONNX Runtime on CPU and never imports
+torch. Export the ONNX model once with:
+
+    python -m rag.embeddings export
+"""
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from config.settings import settings
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ONNX_FP32_FILE = "model.onnx"
+ONNX_QUANTIZED_FILE = "model_quantized.onnx"
+
+
+def get_onnx_model_dir() -> Path:
+    return PROJECT_ROOT / settings.ONNX_MODEL_DIR
+
+
+class OnnxSentenceEmbeddings(Embeddings):
+    """
+    Sentence embeddings from an ONNX export of EMBEDDING_MODEL.
+    
+    Reproduces the sentence-transformers pipeline: mean pooling over the
+    attention mask followed by L2 normalization.
+    """
+
+    def __init__(
+        self,
+        model_dir: Optional[Path] = None,
+        model_file: Optional[str] = None,
+        num_threads: Optional[int] = None,
+        max_length: int = 512,
+    ):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir or get_onnx_model_dir())
+        model_path = model_dir / (model_file or settings.ONNX_MODEL_FILE)
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"ONNX model not found at {model_path}. Run: python -m rag.embeddings export"
+            )
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_padding()
+        self.tokenizer.enable_truncation(max_length=max_length)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads or settings.ONNX_NUM_THREADS
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, inputs)[0]
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._embed(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text])[0].tolist()
+
+
+def create_base_embeddings() -> Embeddings:
+    """Create the uncached embedding model for the configured EMBEDDING_BACKEND"""
+    if settings.EMBEDDING_BACKEND == "onnx":
+        return OnnxSentenceEmbeddings()
+    if settings.EMBEDDING_BACKEND == "torch":
+        # Imported here so the ONNX backend never pays for torch/transformers
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND '{settings.EMBEDDING_BACKEND}' (expected 'torch' or 'onnx')")
+
+
+def export_onnx_model(output_dir: Optional[Path] = None, quantize: bool = True) -> Path:
+    """Export EMBEDDING_MODEL to ONNX (plus a dynamically quantized int8 copy)"""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    output_dir = Path(output_dir or get_onnx_model_dir())
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(settings.EMBEDDING_MODEL)
+    model = AutoModel.from_pretrained(settings.EMBEDDING_MODEL)
+    model.eval()
+    tokenizer.save_pretrained(str(output_dir))
+
+    sample = tokenizer(["a sample product query"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    fp32_path = output_dir / ONNX_FP32_FILE
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+        )
+    print(f"✅ Exported ONNX model to {fp32_path}")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantized_path = output_dir / ONNX_QUANTIZED_FILE
+        quantize_dynamic(str(fp32_path), str(quantized_path), weight_type=QuantType.QInt8)
+        print(f"✅ Quantized ONNX model saved to {quantized_path}")
+    return output_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Embedding backend utilities")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Export EMBEDDING_MODEL to ONNX")
+    export_parser.add_argument("--output-dir", type=Path, default=None)
+    export_parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_onnx_model(args.output_dir, quantize=not args.no_quantize)
+
+
+if __name__ == "__main__":
+    main()
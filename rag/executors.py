@@ -0,0 +1,33 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from config.settings import settings
+
+_cpu_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Shared, bounded pool for CPU-bound work (embedding forward passes, FAISS search)"""
+    global _cpu_executor
+    if _cpu_executor is None:
+        _cpu_executor = ThreadPoolExecutor(
+            max_workers=settings.CPU_EXECUTOR_WORKERS,
+            thread_name_prefix="rag-cpu",
+        )
+    return _cpu_executor
+
+
+async def run_cpu_bound(fn, *args, **kwargs):
+    """Run a blocking function on the CPU pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_executor(), partial(fn, *args, **kwargs))
+
+
+def shutdown_executors():
+    """Stop the shared pools - called on API shutdown"""
+    global _cpu_executor
+    if _cpu_executor is not None:
+        _cpu_executor.shutdown(wait=False)
+        _cpu_executor = None
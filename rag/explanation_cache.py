@@ -0,0 +1,59 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from rag.cache import LRUTTLCache, normalize_query
+
+
+def get_catalog_version() -> int:
+    """Version of the live index (0 when no registry is loaded)"""
+    from rag.vector_store_registry import get_vector_store_registry
+
+    registry = get_vector_store_registry()
+    return registry.version if registry is not None else 0
+
+
+class ExplanationCache:
+    """
+    LRU cache of LLM explanation text.
+    
+    Keyed by (normalized query, ordered top product ids, model, temperature).
+    All entries are dropped as soon as the catalog version changes, since the
+    same ids may now carry different names or prices.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: Optional[float] = None):
+        self._cache = LRUTTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._catalog_version: Optional[int] = None
+        self._version_lock = threading.Lock()
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        query: str,
+        recommendations: List[Dict[str, Any]],
+        model: str,
+        temperature: float,
+    ) -> Tuple:
+        product_ids = tuple(r.get("id") for r in recommendations)
+        return (normalize_query(query), product_ids, model, temperature)
+
+    def _check_version(self, catalog_version: int) -> None:
+        with self._version_lock:
+            if self._catalog_version != catalog_version:
+                if self._catalog_version is not None:
+                    self._cache.clear()
+                    self.invalidations += 1
+                self._catalog_version = catalog_version
+
+    def get(self, key: Tuple, catalog_version: int) -> Optional[str]:
+        self._check_version(catalog_version)
+        return self._cache.get(key)
+
+    def set(self, key: Tuple, explanation: str, catalog_version: int) -> None:
+        self._check_version(catalog_version)
+        self._cache.set(key, explanation)
+
+    def stats(self) -> Dict[str, int]:
+        stats = self._cache.stats()
+        stats["invalidations"] = self.invalidations
+        return stats
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from rag.attribute_index import AttributeIndex
+
+
+@dataclass(frozen=True)
+class SearchFilter:
+    """Structured predicates applied inside the FAISS search"""
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    categories: Optional[Tuple[str, ...]] = None  # exact, case-insensitive
+    in_stock: bool = False
+
+    @classmethod
+    def from_intent(cls, intent) -> Optional["SearchFilter"]:
+        """Hard constraints from an analyzed intent (category stays lenient, as in refine)"""
+        if intent is None or not intent.price_range:
+            return None
+        return cls(
+            min_price=intent.price_range.get("min"),
+            max_price=intent.price_range.get("max"),
+        )
+
+    def is_empty(self) -> bool:
+        return (
+            self.min_price is None and self.max_price is None
+            and not self.categories and not self.in_stock
+        )
+
+    def mask(self, attribute_index: AttributeIndex, row_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Boolean keep-mask over all FAISS rows, or over row_ids only"""
+        def column(values):
+            return values if row_ids is None else values[row_ids]
+
+        keep = np.ones(attribute_index.num_rows if row_ids is None else len(row_ids), dtype=bool)
+        if self.min_price is not None:
+            keep &= column(attribute_index.price) >= self.min_price
+        if self.max_price is not None:
+            keep &= column(attribute_index.price) <= self.max_price
+        if self.categories:
+            codes = [attribute_index.category_code(c) for c in self.categories]
+            keep &= np.isin(column(attribute_index.category_codes), [c for c in codes if c is not None])
+        if self.in_stock:
+            keep &= column(attribute_index.stock) > 0
+        return keep
+
+    def matches(self, result: dict) -> bool:
+        """Same predicate for an already-formatted result dict"""
+        price = result.get("price", 0)
+        if self.min_price is not None and price < self.min_price:
+            return False
+        if self.max_price is not None and price > self.max_price:
+            return False
+        if self.categories and (result.get("category") or "").lower() not in {c.lower() for c in self.categories}:
+            return False
+        if self.in_stock and not (result.get("stock") or 0) > 0:
+            return False
+        return True
+
+
+def build_search_params(index, keep: np.ndarray):
+    """
+    FAISS search parameters restricting results to rows where keep is True.
+    
+    Returns (params, keepalive); the caller must hold on to keepalive until the
+    search finishes because the selector only stores a pointer into the bitmap.
+    """
+    import faiss
+
+    bitmap = np.packbits(keep, bitorder="little")
+    selector = faiss.IDSelectorBitmap(len(keep), faiss.swig_ptr(bitmap))
+    if isinstance(index, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    else:
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+        else:
+            params = faiss.SearchParameters(sel=selector)
+    return params, (bitmap, selector)
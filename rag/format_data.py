@@ -1,5 +1,5 @@
 def format_search_results(
-    results, is_reranked: bool = False, excluded_fields: list = None
+    results, is_reranked: bool = False, excluded_fields: list = None, score_type: str = None
 ):
     """
     Format search results for display - works with ANY product structure.
@@ -9,9 +9,12 @@ def format_search_results(
         is_reranked: If True, score is a rerank score (higher is better).
                     If False, score is a similarity score (lower is better).
         excluded_fields: Optional list of metadata fields to exclude from output
+        score_type: Overrides the reported score_type (e.g. "rrf_score" for hybrid search)
     """
     if excluded_fields is None:
         excluded_fields = []
+    if score_type is None:
+        score_type = "rerank_score" if is_reranked else "similarity_score"
 
     formatted = []
 
@@ -29,10 +32,39 @@ def format_search_results(
             {
                 "content": doc.page_content,
                 "score": float(score),
-                "score_type": "rerank_score" if is_reranked else "similarity_score",
+                "score_type": score_type,
             }
         )
 
         formatted.append(result)
 
     return formatted
+
+
+def format_row_results(
+    metadata_store, row_ids, scores, is_reranked: bool = False,
+    excluded_fields: list = None, fields: list = None, score_type: str = None
+):
+    """
+    Format search results straight from a columnar metadata store by FAISS row id.
+
+    Same output as format_search_results, but dicts are only built for the
+    returned rows and only with the requested fields (all fields if None).
+    "content" is only decoded when it is part of the requested fields.
+    """
+    if excluded_fields is None:
+        excluded_fields = []
+    include_content = (fields is None or "content" in fields) and "content" not in excluded_fields
+    if score_type is None:
+        score_type = "rerank_score" if is_reranked else "similarity_score"
+
+    formatted = []
+    for row, score in zip(row_ids, scores):
+        result = metadata_store.record(int(row), fields=fields, excluded_fields=excluded_fields)
+        if include_content:
+            result["content"] = metadata_store.content.get(int(row))
+        result["score"] = float(score)
+        result["score_type"] = score_type
+        formatted.append(result)
+
+    return formatted
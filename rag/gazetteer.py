@@ -0,0 +1,159 @@
+import json
+import re
+import weakref
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from rag.metadata_store import get_metadata_store, iter_metadata_records
+
+GAZETTEER_FILE = "gazetteer.json"
+
+# Product-name words that say nothing about what the product is
+NAME_STOPWORDS = {
+    "and", "for", "the", "with", "pro", "plus", "max", "original", "budget", "formula",
+    "support", "express", "inch", "quart", "wireless", "cordless", "air",
+}
+
+
+def _variants(term: str) -> Set[str]:
+    """term plus its naive singular/plural, so "headphones" also matches "headphone" """
+    variants = {term}
+    if term.endswith("es") and len(term) > 4:
+        variants.add(term[:-2])
+    if term.endswith("s") and len(term) > 3:
+        variants.add(term[:-1])
+    elif not term.endswith("s"):
+        variants.add(term + "s")
+    return variants
+
+
+class Gazetteer:
+    """
+    Catalog vocabulary for local intent extraction.
+
+    Maps lower-cased terms (category names, brands, product types, use cases,
+    product-name words) to the catalog category they imply - None when a term
+    is shared by several categories - plus the known use cases. Built once from
+    the catalog at ingest and saved next to the index.
+    """
+
+    def __init__(
+        self,
+        categories: Dict[str, Optional[str]],
+        brands: Dict[str, str],
+        use_cases: List[str],
+    ):
+        self.categories = categories  # term -> category (None if ambiguous)
+        self.brands = brands  # lower-cased brand -> brand
+        self.use_cases = use_cases
+        self._term_pattern = self._compile(list(categories) + list(brands))
+        self._use_case_pattern = self._compile(use_cases)
+
+    @staticmethod
+    def _compile(terms: Iterable[str]) -> Optional[re.Pattern]:
+        terms = sorted({t for t in terms if t}, key=len, reverse=True)
+        if not terms:
+            return None
+        return re.compile(r"\b(?:" + "|".join(re.escape(t) for t in terms) + r")\b")
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "Gazetteer":
+        term_categories: Dict[str, Set[str]] = defaultdict(set)
+        brands: Dict[str, str] = {}
+        use_cases: Set[str] = set()
+        brand_words: Set[str] = set()
+
+        records = list(records)
+        for record in records:
+            brand = record.get("brand")
+            if isinstance(brand, str) and brand:
+                brands[brand.lower()] = brand
+                brand_words.update(re.findall(r"[a-z']+", brand.lower()))
+            use_case = record.get("use_case")
+            if isinstance(use_case, str) and use_case:
+                use_cases.add(use_case.lower())
+
+        for record in records:
+            category = record.get("category")
+            if not isinstance(category, str) or not category:
+                continue
+            terms = {category.lower()}
+            terms.update(word for word in category.lower().split() if len(word) > 2)
+            for field in ("type", "use_case"):
+                value = record.get(field)
+                if isinstance(value, str) and value:
+                    terms.add(value.lower())
+                    terms.update(word for word in value.lower().split() if len(word) > 2)
+            brand = record.get("brand")
+            if isinstance(brand, str) and brand:
+                terms.add(brand.lower())
+            for word in re.findall(r"[a-z]+", str(record.get("name", "")).lower()):
+                if len(word) > 2 and word not in NAME_STOPWORDS and word not in brand_words:
+                    terms.add(word)
+            for term in terms:
+                for variant in _variants(term):
+                    term_categories[variant].add(category)
+
+        categories = {
+            term: next(iter(found)) if len(found) == 1 else None
+            for term, found in term_categories.items()
+        }
+        return cls(categories, brands, sorted(use_cases))
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore) -> "Gazetteer":
+        return cls.from_records(iter_metadata_records(vectorstore))
+
+    def match_terms(self, text: str) -> List[str]:
+        """Known catalog terms in text (lower-cased), longest match first at each position"""
+        if self._term_pattern is None:
+            return []
+        return self._term_pattern.findall(text.lower())
+
+    def match_use_cases(self, text: str) -> List[str]:
+        if self._use_case_pattern is None:
+            return []
+        return self._use_case_pattern.findall(text.lower())
+
+    def resolve(self, text: str) -> Tuple[Set[str], Optional[str]]:
+        """(categories implied by the terms in text, first brand mentioned)"""
+        categories, brand = set(), None
+        for term in self.match_terms(text):
+            if term in self.brands and brand is None:
+                brand = self.brands[term]
+            category = self.categories.get(term)
+            if category is not None:
+                categories.add(category)
+        return categories, brand
+
+    def save(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"categories": self.categories, "brands": self.brands, "use_cases": self.use_cases},
+                f,
+                ensure_ascii=False,
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "Gazetteer":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["categories"], data["brands"], data["use_cases"])
+
+
+_gazetteers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_gazetteer(vectorstore) -> Gazetteer:
+    """Gazetteer for vectorstore: gazetteer.json written at ingest, else built once per store"""
+    gazetteer = _gazetteers.get(vectorstore)
+    if gazetteer is None:
+        metadata_store = get_metadata_store(vectorstore)
+        path = Path(metadata_store.path).parent / GAZETTEER_FILE if metadata_store is not None else None
+        if path is not None and path.exists():
+            gazetteer = Gazetteer.load(path)
+        else:
+            gazetteer = Gazetteer.from_vectorstore(vectorstore)
+        _gazetteers[vectorstore] = gazetteer
+    return gazetteer
@@ -0,0 +1,150 @@
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import numpy as np
+
+from config.settings import settings
+
+INDEX_KINDS = ("flat", "hnsw", "ivf", "ivfpq")
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """Which FAISS index to build, plus its build-time and search-time parameters"""
+    kind: str = "flat"
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 40
+    hnsw_ef_search: int = 64
+    ivf_nlist: int = 100
+    ivf_nprobe: int = 8
+    pq_m: int = 8
+    pq_nbits: int = 8
+
+    def __post_init__(self):
+        if self.kind not in INDEX_KINDS:
+            raise ValueError(f"Unknown index kind '{self.kind}' (expected one of {INDEX_KINDS})")
+
+    @classmethod
+    def from_settings(cls) -> "IndexSpec":
+        return cls(
+            kind=settings.FAISS_INDEX_TYPE.lower(),
+            hnsw_m=settings.FAISS_HNSW_M,
+            hnsw_ef_construction=settings.FAISS_HNSW_EF_CONSTRUCTION,
+            hnsw_ef_search=settings.FAISS_HNSW_EF_SEARCH,
+            ivf_nlist=settings.FAISS_IVF_NLIST,
+            ivf_nprobe=settings.FAISS_IVF_NPROBE,
+            pq_m=settings.FAISS_PQ_M,
+            pq_nbits=settings.FAISS_PQ_NBITS,
+        )
+
+    def fitted_to(self, num_vectors: int) -> "IndexSpec":
+        """
+        Shrink training-dependent parameters for small catalogs.
+        
+        FAISS wants ~39 training points per IVF list and 2**nbits points per PQ codebook.
+        """
+        nlist = max(1, min(self.ivf_nlist, num_vectors // 39 or 1))
+        nbits = self.pq_nbits
+        while nbits > 1 and (1 << nbits) > num_vectors:
+            nbits -= 1
+        return replace(self, ivf_nlist=nlist, ivf_nprobe=min(self.ivf_nprobe, nlist), pq_nbits=nbits)
+
+    def label(self) -> str:
+        if self.kind == "hnsw":
+            return f"HNSW(M={self.hnsw_m}, efSearch={self.hnsw_ef_search})"
+        if self.kind == "ivf":
+            return f"IVF(nlist={self.ivf_nlist}, nprobe={self.ivf_nprobe})"
+        if self.kind == "ivfpq":
+            return f"IVF-PQ(nlist={self.ivf_nlist}, nprobe={self.ivf_nprobe}, m={self.pq_m}, nbits={self.pq_nbits})"
+        return "Flat"
+
+
+def build_index(vectors: np.ndarray, spec: Optional[IndexSpec] = None, metric: Optional[int] = None):
+    """Create, train (if needed) and fill a FAISS index for vectors"""
+    import faiss
+
+    spec = (spec or IndexSpec.from_settings()).fitted_to(len(vectors))
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    dimension = vectors.shape[1]
+    metric = faiss.METRIC_L2 if metric is None else metric
+
+    if spec.kind == "flat":
+        index = faiss.IndexFlat(dimension, metric)
+    elif spec.kind == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, spec.hnsw_m, metric)
+        index.hnsw.efConstruction = spec.hnsw_ef_construction
+    else:
+        quantizer = faiss.IndexFlat(dimension, metric)
+        if spec.kind == "ivf":
+            index = faiss.IndexIVFFlat(quantizer, dimension, spec.ivf_nlist, metric)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dimension, spec.ivf_nlist, spec.pq_m, spec.pq_nbits, metric)
+        index.train(vectors)
+
+    index.add(vectors)
+    apply_search_params(index, spec)
+    return index
+
+
+def apply_search_params(index, spec: Optional[IndexSpec] = None) -> None:
+    """Set search-time knobs (efSearch / nprobe) on a built or freshly loaded index"""
+    import faiss
+
+    spec = spec or IndexSpec.from_settings()
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = spec.hnsw_ef_search
+        return
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = max(1, min(spec.ivf_nprobe, ivf.nlist))
+
+
+def read_index(path, mmap: bool = False):
+    """
+    faiss.read_index; with mmap the file is opened read-only and memory-mapped,
+    so every process serving it shares the same page-cache pages.
+    """
+    import faiss
+
+    if not mmap:
+        return faiss.read_index(str(path))
+    # IO_FLAG_MMAP_IFC maps the vectors/codes in place; older builds only mmap IVF lists
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    return faiss.read_index(str(path), flags)
+
+
+def supports_remove(index) -> bool:
+    """
+    Whether vectors can be removed in place. LangChain's FAISS.delete renumbers
+    rows contiguously, which only matches a flat index (remove_ids compacts it);
+    HNSW graphs can't remove at all and IVF lists keep their original labels.
+    """
+    import faiss
+    return not isinstance(index, faiss.IndexHNSW) and faiss.try_extract_index_ivf(index) is None
+
+
+def index_spec_for(index) -> IndexSpec:
+    """IndexSpec (FAISS_* settings) for the kind of an already-built index"""
+    import faiss
+
+    if isinstance(index, faiss.IndexHNSW):
+        kind = "hnsw"
+    elif isinstance(index, faiss.IndexIVFPQ):
+        kind = "ivfpq"
+    elif faiss.try_extract_index_ivf(index) is not None:
+        kind = "ivf"
+    else:
+        kind = "flat"
+    return replace(IndexSpec.from_settings(), kind=kind)
+
+
+def reconstruct_vectors(index) -> Optional[np.ndarray]:
+    """All stored vectors in row order, or None when the index only keeps lossy codes (PQ)"""
+    import faiss
+
+    if isinstance(index, faiss.IndexIVFPQ):
+        return None
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
@@ -0,0 +1,243 @@
+"""
+Incremental maintenance of the FAISS product index.
+
+A manifest (manifest.json next to index.faiss) maps each product id to its
+docstore id and a hash of its create_product_content() text. Applying a
+catalog diff re-embeds only new or changed products, removes deleted ones,
+and saves the index once.
+
+Usage:
+    python -m rag.index_maintenance diff.json            # {"upsert": [...], "delete": [...]}
+    python -m rag.index_maintenance --catalog products.json
+"""
+import argparse
+import hashlib
+import json
+import logging
+import sys
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from langchain_core.documents import Document
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+# Only one diff may rewrite the on-disk index at a time
+_apply_lock = threading.Lock()
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def get_store_path(name: Optional[str] = None) -> Path:
+    """Store directory; name is relative to the project root, or absolute"""
+    return Path(__file__).parent.parent / (name or settings.VECTOR_STORE_NAME)
+
+
+def load_manifest(faiss_path: Path) -> Optional[Dict[str, Dict[str, str]]]:
+    manifest_path = Path(faiss_path) / MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)["products"]
+
+
+def save_manifest(faiss_path: Path, manifest: Dict[str, Dict[str, str]]) -> None:
+    with open(Path(faiss_path) / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump({"products": manifest}, f, indent=2)
+
+
+def build_manifest(vectorstore) -> Dict[str, Dict[str, str]]:
+    """Bootstrap a manifest from an existing store (page_content is create_product_content output)"""
+    manifest = {}
+    for docstore_id in vectorstore.index_to_docstore_id.values():
+        doc = vectorstore.docstore.search(docstore_id)
+        manifest[str(doc.metadata["id"])] = {
+            "docstore_id": docstore_id,
+            "content_hash": content_hash(doc.page_content),
+        }
+    return manifest
+
+
+def diff_from_catalog(manifest: Dict[str, Dict[str, str]], products: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Turn a full catalog into a diff: upsert everything, delete ids no longer present"""
+    catalog_ids = {str(product["id"]) for product in products}
+    return {
+        "upsert": products,
+        "delete": [product_id for product_id in manifest if product_id not in catalog_ids],
+    }
+
+
+def apply_catalog_diff(
+    vectorstore,
+    manifest: Dict[str, Dict[str, str]],
+    upsert: Iterable[Dict[str, Any]] = (),
+    delete: Iterable[Any] = (),
+) -> Dict[str, int]:
+    """
+    Apply a diff to vectorstore and manifest in place.
+    
+    Unchanged products (same content hash) are skipped; changed ones are removed
+    and re-added, so only new/changed products are embedded (in one batch).
+    """
+    from rag.ingest import create_product_content, create_product_metadata
+
+    summary = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    remove_docstore_ids = []
+    new_documents, new_docstore_ids, new_entries = [], [], {}
+
+    for product_id in delete:
+        entry = manifest.pop(str(product_id), None)
+        if entry is not None:
+            remove_docstore_ids.append(entry["docstore_id"])
+            summary["deleted"] += 1
+
+    for product in upsert:
+        product_id = str(product["id"])
+        content = create_product_content(product)
+        digest = content_hash(content)
+        entry = manifest.get(product_id)
+        if entry is not None and entry["content_hash"] == digest:
+            summary["unchanged"] += 1
+            continue
+        if entry is not None:
+            remove_docstore_ids.append(entry["docstore_id"])
+            summary["updated"] += 1
+        else:
+            summary["added"] += 1
+        docstore_id = str(uuid.uuid4())
+        new_documents.append(Document(page_content=content, metadata=create_product_metadata(product)))
+        new_docstore_ids.append(docstore_id)
+        new_entries[product_id] = {"docstore_id": docstore_id, "content_hash": digest}
+
+    from rag.index_factory import supports_remove
+    if remove_docstore_ids and not supports_remove(vectorstore.index):
+        rebuild_index(vectorstore, remove_docstore_ids, new_documents, new_docstore_ids)
+    else:
+        if remove_docstore_ids:
+            vectorstore.delete(remove_docstore_ids)
+        if new_documents:
+            vectorstore.add_documents(new_documents, ids=new_docstore_ids)
+    manifest.update(new_entries)
+    return summary
+
+
+def rebuild_index(
+    vectorstore,
+    remove_docstore_ids: List[str],
+    new_documents: List[Document],
+    new_docstore_ids: List[str],
+) -> None:
+    """
+    Rebuild vectorstore's index without remove_docstore_ids and with new_documents,
+    for index kinds that can't remove vectors in place (HNSW, IVF, IVF-PQ).
+    
+    Kept rows reuse their stored vectors where FAISS can reconstruct them exactly;
+    IVF-PQ only keeps lossy codes, so its kept rows are re-embedded.
+    """
+    import numpy as np
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from rag.index_factory import build_index, index_spec_for, reconstruct_vectors
+
+    index = vectorstore.index
+    removed = set(remove_docstore_ids)
+    kept_rows = [row for row in range(index.ntotal) if vectorstore.index_to_docstore_id[row] not in removed]
+    docstore_ids = [vectorstore.index_to_docstore_id[row] for row in kept_rows]
+    documents = [vectorstore.docstore.search(docstore_id) for docstore_id in docstore_ids]
+
+    stored = reconstruct_vectors(index)
+    if stored is not None:
+        to_embed = new_documents
+        vectors = [stored[kept_rows]]
+    else:
+        to_embed = documents + new_documents
+        vectors = []
+    if to_embed:
+        vectors.append(np.asarray(
+            vectorstore.embedding_function.embed_documents([doc.page_content for doc in to_embed]),
+            dtype=np.float32
+        ))
+    spec = index_spec_for(index)
+    logger.info("🔨 %s index can't remove vectors in place; rebuilding it (%d rows)", spec.kind, len(docstore_ids) + len(new_documents))
+
+    docstore_ids += new_docstore_ids
+    documents += new_documents
+    vectorstore.index = build_index(np.concatenate(vectors), spec, metric=index.metric_type)
+    vectorstore.docstore = InMemoryDocstore(dict(zip(docstore_ids, documents)))
+    vectorstore.index_to_docstore_id = dict(enumerate(docstore_ids))
+
+
+def apply_diff_to_store(
+    diff: Dict[str, Any],
+    name: Optional[str] = None,
+    registry=None,
+    embeddings=None,
+) -> Dict[str, int]:
+    """
+    Apply a diff to the on-disk index, save it once, and hot-swap it into registry.
+    
+    The diff is applied to a fresh copy loaded from disk, never to the live store,
+    so in-flight searches are unaffected until the swap.
+    """
+    from rag.create_vector_store import create_load_vector_store, save_vector_store
+
+    faiss_path = get_store_path(name or (registry.name if registry else None))
+    if embeddings is None and registry is not None and registry.is_loaded:
+        embeddings = registry.embeddings
+    with _apply_lock:
+        vectorstore = create_load_vector_store(name=str(faiss_path), embeddings=embeddings, writable=True)
+        manifest = load_manifest(faiss_path)
+        if manifest is None:
+            manifest = build_manifest(vectorstore)
+
+        summary = apply_catalog_diff(
+            vectorstore,
+            manifest,
+            upsert=diff.get("upsert", []),
+            delete=diff.get("delete", []),
+        )
+        if summary["added"] or summary["updated"] or summary["deleted"]:
+            save_vector_store(vectorstore, faiss_path)
+            save_manifest(faiss_path, manifest)
+            if registry is not None:
+                registry.reload()
+    logger.info("✅ Applied catalog diff: %s", summary)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a catalog diff to the FAISS product index")
+    parser.add_argument("diff", nargs="?", type=Path, help='JSON file: {"upsert": [...], "delete": [...]}')
+    parser.add_argument("--catalog", type=Path, help="Full products.json to sync the index against")
+    parser.add_argument("--name", default=None, help="Vector store directory name")
+    args = parser.parse_args(argv)
+
+    from config.logging_config import configure_logging
+    configure_logging()
+
+    if args.catalog:
+        from rag.load_products import load_products
+        faiss_path = get_store_path(args.name)
+        manifest = load_manifest(faiss_path)
+        if manifest is None:
+            from rag.create_vector_store import create_load_vector_store
+            manifest = build_manifest(create_load_vector_store(name=str(faiss_path), writable=True))
+        diff = diff_from_catalog(manifest, load_products(args.catalog))
+    elif args.diff:
+        with open(args.diff, "r", encoding="utf-8") as f:
+            diff = json.load(f)
+    else:
+        parser.error("Provide a diff file or --catalog")
+
+    apply_diff_to_store(diff, name=args.name)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
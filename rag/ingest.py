@@ -1,5 +1,9 @@
+import logging
+
 from langchain_core.documents import Document
 
+logger = logging.getLogger(__name__)
+
 
 def create_product_content(product):
     """
@@ -75,5 +79,5 @@ def create_documents(products):
         )
         documents.append(doc)
 
-    print(f"✅ Created {len(documents)} documents")
+    logger.info("✅ Created %d documents", len(documents))
     return documents
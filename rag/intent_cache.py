@@ -0,0 +1,154 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from rag.cache import LRUTTLCache, normalize_query
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+class SemanticIntentCache:
+    """
+    Two-tier cache of LLM intent analyses.
+    
+    - exact tier: normalized query text -> intent (no embedding needed)
+    - near tier: cosine search over the embeddings of cached queries; a query
+      within max_cosine_distance of a cached one reuses its intent
+    
+    Near matches additionally require the same numbers in both queries, so
+    "laptop under $300" never reuses the price range of "laptop under $800".
+    Both tiers expire entries after ttl_seconds.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        max_cosine_distance: float,
+        ttl_seconds: Optional[float] = None,
+        embed_fn: Optional[Callable[[str], Optional[Sequence[float]]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.max_cosine_distance = max_cosine_distance
+        self.ttl_seconds = ttl_seconds
+        self.embed_fn = embed_fn
+        self._clock = clock
+        self._exact = LRUTTLCache(max_size=max_size, ttl_seconds=ttl_seconds, clock=clock)
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._free_slots: List[int] = list(range(max_size - 1, -1, -1))
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Optional[tuple]] = [None] * max_size
+        self._expires_at = np.full(max_size, np.inf)
+        self.near_hits = 0
+        self.near_evictions = 0
+        self.near_expirations = 0
+
+    def _embed(self, normalized: str) -> Optional[np.ndarray]:
+        if self.embed_fn is None:
+            return None
+        vector = self.embed_fn(normalized)
+        if vector is None:
+            return None
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def lookup(self, query: str) -> Optional[Any]:
+        """Return a cached intent for query (exact, then near tier) or None"""
+        normalized = normalize_query(query)
+        intent = self._exact.get(normalized)
+        if intent is not None:
+            return intent.model_copy(deep=True)
+        
+        if self._vectors is None:
+            return None
+        vector = self._embed(normalized)
+        if vector is None:
+            return None
+        
+        numbers = _NUMBER.findall(normalized)
+        hit = None
+        with self._lock:
+            self._expire_slots()
+            similarities = self._vectors @ vector
+            # Unused slots are zero vectors (distance 1.0), so they never match
+            for slot in np.argsort(-similarities):
+                if 1.0 - similarities[slot] > self.max_cosine_distance:
+                    break
+                entry = self._entries[slot]
+                if entry is None or entry[1] != numbers:
+                    continue
+                cached_key, _, hit = entry
+                self._slots.move_to_end(cached_key)
+                self.near_hits += 1
+                break
+        if hit is None:
+            return None
+        # Promote so the next identical query is answered by the exact tier
+        self._exact.set(normalized, hit)
+        return hit.model_copy(deep=True)
+
+    def _free_slot(self, slot: int) -> None:
+        """Caller holds self._lock"""
+        del self._slots[self._entries[slot][0]]
+        self._entries[slot] = None
+        self._vectors[slot] = 0.0
+        self._expires_at[slot] = np.inf
+        self._free_slots.append(slot)
+
+    def _expire_slots(self) -> None:
+        """Free near-tier slots past their TTL, so a query can't re-promote its own stale intent"""
+        for slot in np.flatnonzero(self._expires_at <= self._clock()):
+            self._free_slot(int(slot))
+            self.near_expirations += 1
+
+    def store(self, query: str, intent: Any) -> None:
+        """Cache the intent produced by the LLM for query"""
+        normalized = normalize_query(query)
+        self._exact.set(normalized, intent)
+        
+        vector = self._embed(normalized)
+        if vector is None:
+            return
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+            slot = self._slots.pop(normalized, None)
+            if slot is None:
+                if not self._free_slots:
+                    _, evicted_slot = self._slots.popitem(last=False)
+                    self._free_slots.append(evicted_slot)
+                    self.near_evictions += 1
+                slot = self._free_slots.pop()
+            self._slots[normalized] = slot
+            self._vectors[slot] = vector
+            self._entries[slot] = (normalized, _NUMBER.findall(normalized), intent)
+            self._expires_at[slot] = self._clock() + self.ttl_seconds if self.ttl_seconds else np.inf
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
+            self._slots.clear()
+            self._free_slots = list(range(self.max_size - 1, -1, -1))
+            self._entries = [None] * self.max_size
+            self._expires_at[:] = np.inf
+            if self._vectors is not None:
+                self._vectors[:] = 0.0
+
+    def stats(self) -> Dict[str, int]:
+        exact = self._exact.stats()
+        return {
+            "exact_hits": exact["hits"],
+            "near_hits": self.near_hits,
+            # exact misses that the near tier answered are not real misses
+            "misses": exact["misses"] - self.near_hits,
+            "exact_size": exact["size"],
+            "near_size": len(self._slots),
+            "evictions": exact["evictions"] + self.near_evictions,
+            "expirations": exact["expirations"] + self.near_expirations,
+        }
@@ -0,0 +1,195 @@
+"""
+BM25 inverted index over the product content strings.
+
+Built at ingest from the same create_product_content() text that is embedded,
+addressed by FAISS row id and saved as lexical.npz next to index.faiss.
+Postings are stored CSR-style: one array of row ids and one of term
+frequencies, sliced per term by an offsets array.
+"""
+import json
+import re
+import weakref
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from rag.metadata_store import get_metadata_store, iter_page_contents
+
+LEXICAL_FILE = "lexical.npz"
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "best", "by", "for", "from", "i", "in", "is", "it",
+    "me", "my", "need", "of", "on", "or", "some", "that", "the", "this", "to", "want", "with",
+})
+
+
+def _stem(token: str) -> str:
+    """Naive plural folding so "shoes" matches "shoe" """
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(token) for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over FAISS rows; higher scores are better"""
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        offsets: np.ndarray,
+        postings: np.ndarray,
+        frequencies: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.vocabulary = vocabulary  # term -> term id
+        self.offsets = offsets  # postings of term t are [offsets[t], offsets[t + 1])
+        self.postings = postings  # row ids, ascending within a term
+        self.frequencies = frequencies
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        num_rows = len(doc_lengths)
+        self.avg_doc_length = float(doc_lengths.mean()) if num_rows else 0.0
+        document_frequency = np.diff(offsets)
+        self.idf = np.log1p((num_rows - document_frequency + 0.5) / (document_frequency + 0.5))
+        # Query terms the catalog has never seen weigh as much as the rarest possible term
+        self.unknown_idf = float(np.log1p((num_rows + 0.5) / 0.5))
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.doc_lengths)
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        vocabulary: Dict[str, int] = {}
+        term_ids: List[int] = []
+        rows: List[int] = []
+        counts: List[int] = []
+        doc_lengths: List[int] = []
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for term, count in Counter(tokens).items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                rows.append(row)
+                counts.append(count)
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_ids, kind="stable")  # rows stay ascending within each term
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)), out=offsets[1:])
+        return cls(
+            vocabulary,
+            offsets,
+            np.asarray(rows, dtype=np.int64)[order],
+            np.asarray(counts, dtype=np.float32)[order],
+            np.asarray(doc_lengths, dtype=np.float32),
+            k1,
+            b,
+        )
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore) -> "BM25Index":
+        return cls.from_texts(iter_page_contents(vectorstore))
+
+    def _query_terms(self, query: str) -> Tuple[List[int], int]:
+        """(distinct known term ids, number of distinct unknown terms)"""
+        terms = dict.fromkeys(tokenize(query))
+        known = [self.vocabulary[term] for term in terms if term in self.vocabulary]
+        return known, len(terms) - len(known)
+
+    def search(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(row_ids, scores) of the k best-scoring rows that contain any query term, best first"""
+        term_ids, _ = self._query_terms(query)
+        if not term_ids or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        rows, contributions = [], []
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            term_rows = self.postings[start:end]
+            tf = self.frequencies[start:end]
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[term_rows] / self.avg_doc_length)
+            rows.append(term_rows)
+            contributions.append(self.idf[term_id] * tf * (self.k1 + 1) / (tf + norm))
+        unique_rows, inverse = np.unique(np.concatenate(rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions)).astype(np.float32)
+
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.lexsort((unique_rows[top], -scores[top]))]  # best first, ties by row id
+        return unique_rows[top], scores[top]
+
+    def coverage(self, query: str, row: int) -> float:
+        """IDF-weighted share of the query's terms that occur in row (0..1); unknown terms count as missing"""
+        term_ids, unknown = self._query_terms(query)
+        total = sum(float(self.idf[term_id]) for term_id in term_ids) + unknown * self.unknown_idf
+        if total <= 0:
+            return 0.0
+        matched = 0.0
+        for term_id in term_ids:
+            term_rows = self.postings[self.offsets[term_id]:self.offsets[term_id + 1]]
+            position = np.searchsorted(term_rows, row)
+            if position < len(term_rows) and term_rows[position] == row:
+                matched += float(self.idf[term_id])
+        return matched / total
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            vocabulary=np.array(json.dumps(self.vocabulary)),
+            offsets=self.offsets,
+            postings=self.postings,
+            frequencies=self.frequencies,
+            doc_lengths=self.doc_lengths,
+            params=np.array([self.k1, self.b]),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        with np.load(path) as data:
+            k1, b = (float(value) for value in data["params"])
+            return cls(
+                json.loads(str(data["vocabulary"])),
+                data["offsets"],
+                data["postings"],
+                data["frequencies"],
+                data["doc_lengths"],
+                k1,
+                b,
+            )
+
+
+_lexical_indexes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _load_persisted(vectorstore) -> Optional[BM25Index]:
+    """lexical.npz written at ingest, found next to the columnar metadata store"""
+    metadata_store = get_metadata_store(vectorstore)
+    if metadata_store is None:
+        return None
+    path = Path(metadata_store.path).parent / LEXICAL_FILE
+    if not path.exists():
+        return None
+    lexical_index = BM25Index.load(path)
+    return lexical_index if lexical_index.num_rows == vectorstore.index.ntotal else None
+
+
+def get_lexical_index(vectorstore) -> BM25Index:
+    """BM25 index for vectorstore: loaded from ingest output, else built once per store"""
+    lexical_index = _lexical_indexes.get(vectorstore)
+    if lexical_index is None or lexical_index.num_rows != vectorstore.index.ntotal:
+        lexical_index = _load_persisted(vectorstore) or BM25Index.from_vectorstore(vectorstore)
+        _lexical_indexes[vectorstore] = lexical_index
+    return lexical_index
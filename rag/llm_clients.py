@@ -0,0 +1,148 @@
+import threading
+from typing import Dict, Optional
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from config.settings import settings
+from rag.metrics import LLMMetricsCallback
+
+NEW_CONNECTION_EVENT = "connection.connect_tcp.complete"
+
+
+class ConnectionStats:
+    """Counts HTTP requests and the TCP connections opened to serve them"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.requests - self.connections_opened,
+            }
+
+
+class LLMClientPool:
+    """
+    Long-lived LLM clients shared by every request.
+    
+    Both the sync and async httpx clients keep a keep-alive connection pool, so
+    the hot path never pays for a new client, TLS handshake or connection setup.
+    The structured-output runnable for understand_promt is bound once here.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections: int = settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+        timeout: float = settings.LLM_TIMEOUT_SECONDS,
+        max_retries: int = settings.LLM_MAX_RETRIES,
+        base_url: Optional[str] = settings.LLM_BASE_URL,
+    ):
+        from rag.analazye_promt import understand_promt
+
+        self.stats = ConnectionStats()
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http_client = httpx.Client(
+            limits=limits,
+            timeout=timeout,
+            event_hooks={"request": [self._trace_request]},
+        )
+        self.http_async_client = httpx.AsyncClient(
+            limits=limits,
+            timeout=timeout,
+            event_hooks={"request": [self._atrace_request]},
+        )
+
+        client_kwargs = {
+            "http_client": self.http_client,
+            "http_async_client": self.http_async_client,
+            "timeout": timeout,
+            "max_retries": max_retries,
+        }
+        if base_url:
+            client_kwargs["base_url"] = base_url
+
+        self.intent_llm = ChatOpenAI(
+            model=settings.INTENT_LLM_MODEL,
+            temperature=0,
+            callbacks=[LLMMetricsCallback("intent")],
+            **client_kwargs,
+        )
+        self.intent_runnable = self.intent_llm.with_structured_output(understand_promt)
+        self.explanation_llm = ChatOpenAI(
+            model=settings.LLM_MODEL,
+            temperature=settings.LLM_TEMPERATURE,
+            callbacks=[LLMMetricsCallback("explanation")],
+            stream_usage=True,  # token counts for streamed explanations too
+            **client_kwargs,
+        )
+
+    # httpcore reports connection lifecycle events through the "trace" extension
+    def _trace_request(self, request: httpx.Request) -> None:
+        self.stats.record_request()
+        request.extensions["trace"] = self._trace_event
+
+    async def _atrace_request(self, request: httpx.Request) -> None:
+        self.stats.record_request()
+        request.extensions["trace"] = self._atrace_event
+
+    def _trace_event(self, event_name: str, info: dict) -> None:
+        if event_name == NEW_CONNECTION_EVENT:
+            self.stats.record_connection()
+
+    async def _atrace_event(self, event_name: str, info: dict) -> None:
+        self._trace_event(event_name, info)
+
+    def connection_stats(self) -> Dict[str, int]:
+        return self.stats.snapshot()
+
+    async def aclose(self) -> None:
+        self.http_client.close()
+        await self.http_async_client.aclose()
+
+
+_pool: Optional[LLMClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_llm_client_pool() -> LLMClientPool:
+    """Return the process-wide LLM client pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = LLMClientPool()
+    return _pool
+
+
+def set_llm_client_pool(pool: Optional[LLMClientPool]) -> None:
+    """Install a specific pool (e.g. one pointed at a local OpenAI-compatible server)"""
+    global _pool
+    _pool = pool
+
+
+async def close_llm_client_pool() -> None:
+    """Close pooled connections - called on API shutdown"""
+    global _pool
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
@@ -1,11 +1,15 @@
 import json
+import logging
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+
 def load_products(file_path="products.json"):
     """Load products from JSON"""
     
     with open(file_path, "r", encoding="utf-8") as f:
         products = json.load(f)
 
-    print(f"✅ Loaded {len(products)} products")
+    logger.info("✅ Loaded %d products", len(products))
     return products
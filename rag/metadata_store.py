@@ -0,0 +1,226 @@
+"""
+Column-oriented, memory-mapped product metadata.
+
+Replaces the pickled docstore for serving: numeric fields are stored as .npy
+arrays, strings as an offset array plus a UTF-8 blob, and everything is opened
+with mmap, so load time and resident memory don't grow with the catalog.
+Rows are addressed by FAISS row id.
+"""
+import json
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_community.docstore.base import Docstore
+
+METADATA_DIR = "metadata"
+SCHEMA_FILE = "schema.json"
+CONTENT_COLUMN = "__content__"
+
+_KIND_DTYPES = {"int": np.int64, "float": np.float64, "bool": np.int8}
+
+
+def _column_kind(values: List[Any]) -> str:
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, bool) for v in present):
+        return "bool"
+    if present and all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return "int"
+    if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return "float"
+    if all(isinstance(v, str) for v in present):
+        return "string"
+    return "json"  # nested/mixed values round-trip through JSON
+
+
+def _write_string_column(path: Path, name: str, values: List[Optional[str]]) -> None:
+    encoded = [(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    np.save(path / f"{name}.offsets.npy", offsets)
+    (path / f"{name}.blob").write_bytes(b"".join(encoded))
+
+
+def write_metadata_store(documents: Sequence[Document], path: Path) -> None:
+    """Write documents (in FAISS row order) as a columnar store under path"""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    field_order: List[str] = []
+    for doc in documents:
+        for key in doc.metadata:
+            if key not in field_order:
+                field_order.append(key)
+
+    columns = {}
+    for name in field_order:
+        values = [doc.metadata.get(name) for doc in documents]
+        kind = _column_kind(values)
+        present = np.array([v is not None for v in values], dtype=bool)
+        if kind in _KIND_DTYPES:
+            array = np.array([v if v is not None else 0 for v in values], dtype=_KIND_DTYPES[kind])
+            np.save(path / f"{name}.npy", array)
+        elif kind == "string":
+            _write_string_column(path, name, values)
+        else:
+            _write_string_column(path, name, [json.dumps(v) if v is not None else None for v in values])
+        has_missing = not present.all()
+        if has_missing:
+            np.save(path / f"{name}.present.npy", present)
+        columns[name] = {"kind": kind, "has_missing": has_missing}
+
+    _write_string_column(path, CONTENT_COLUMN, [doc.page_content for doc in documents])
+
+    with open(path / SCHEMA_FILE, "w", encoding="utf-8") as f:
+        json.dump({"num_rows": len(documents), "field_order": field_order, "columns": columns}, f, indent=2)
+
+
+class _StringColumn:
+    def __init__(self, path: Path, name: str):
+        self.offsets = np.load(path / f"{name}.offsets.npy", mmap_mode="r")
+        blob_path = path / f"{name}.blob"
+        # np.memmap refuses empty files
+        self.blob = np.memmap(blob_path, dtype=np.uint8, mode="r") if blob_path.stat().st_size else b""
+
+    def get(self, row: int) -> str:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return bytes(self.blob[start:end]).decode("utf-8")
+
+
+class ColumnarMetadataStore:
+    """Read-only, memory-mapped metadata addressed by FAISS row id"""
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        with open(path / SCHEMA_FILE, "r", encoding="utf-8") as f:
+            schema = json.load(f)
+        self.path = path
+        self.num_rows: int = schema["num_rows"]
+        self.field_order: List[str] = schema["field_order"]
+        self.kinds: Dict[str, str] = {name: spec["kind"] for name, spec in schema["columns"].items()}
+        self.numeric: Dict[str, np.ndarray] = {}
+        self.strings: Dict[str, _StringColumn] = {}
+        self.present: Dict[str, np.ndarray] = {}
+        for name, spec in schema["columns"].items():
+            if spec["kind"] in _KIND_DTYPES:
+                self.numeric[name] = np.load(path / f"{name}.npy", mmap_mode="r")
+            else:
+                self.strings[name] = _StringColumn(path, name)
+            if spec["has_missing"]:
+                self.present[name] = np.load(path / f"{name}.present.npy", mmap_mode="r")
+        self.content = _StringColumn(path, CONTENT_COLUMN)
+
+    @classmethod
+    def exists(cls, path: Path) -> bool:
+        return (Path(path) / SCHEMA_FILE).exists()
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def value(self, name: str, row: int) -> Any:
+        kind = self.kinds[name]
+        if kind == "int":
+            return int(self.numeric[name][row])
+        if kind == "float":
+            return float(self.numeric[name][row])
+        if kind == "bool":
+            return bool(self.numeric[name][row])
+        if kind == "string":
+            return self.strings[name].get(row)
+        return json.loads(self.strings[name].get(row))
+
+    def record(
+        self,
+        row: int,
+        fields: Optional[Iterable[str]] = None,
+        excluded_fields: Iterable[str] = (),
+    ) -> Dict[str, Any]:
+        """Build a metadata dict for one row with only the requested fields"""
+        excluded = set(excluded_fields)
+        names = self.field_order if fields is None else [f for f in fields if f in self.kinds]
+        result = {}
+        for name in names:
+            if name in excluded:
+                continue
+            present = self.present.get(name)
+            if present is not None and not present[row]:
+                continue
+            result[name] = self.value(name, row)
+        return result
+
+    def document(self, row: int) -> Document:
+        return Document(page_content=self.content.get(row), metadata=self.record(row))
+
+
+class ColumnarDocstore(Docstore):
+    """Read-only docstore view so LangChain's FAISS wrapper works on top of the columnar store"""
+
+    def __init__(self, metadata_store: ColumnarMetadataStore):
+        self.metadata_store = metadata_store
+
+    def search(self, search: str):
+        row = int(search)
+        if not 0 <= row < len(self.metadata_store):
+            return f"ID {search} not found."
+        return self.metadata_store.document(row)
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        self._read_only()
+
+    def delete(self, ids: List) -> None:
+        self._read_only()
+
+    @staticmethod
+    def _read_only():
+        raise TypeError(
+            "The columnar docstore is read-only; apply catalog changes with rag.index_maintenance "
+            "(apply_diff_to_store) or load the store with writable=True"
+        )
+
+
+class RowIdMapping(Mapping):
+    """index_to_docstore_id for the columnar store: row i maps to docstore id "i" without a dict"""
+
+    def __init__(self, num_rows: int):
+        self.num_rows = num_rows
+
+    def __getitem__(self, row: int) -> str:
+        if not 0 <= row < self.num_rows:
+            raise KeyError(row)
+        return str(row)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.num_rows))
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+
+def get_metadata_store(vectorstore) -> Optional[ColumnarMetadataStore]:
+    """The columnar store behind vectorstore, or None for a pickled docstore"""
+    docstore = getattr(vectorstore, "docstore", None)
+    if isinstance(docstore, ColumnarDocstore):
+        return docstore.metadata_store
+    return None
+
+
+def iter_metadata_records(vectorstore) -> Iterator[Dict[str, Any]]:
+    """Metadata dict of every row, in FAISS row order, for either docstore kind"""
+    metadata_store = get_metadata_store(vectorstore)
+    for row in range(vectorstore.index.ntotal):
+        if metadata_store is not None:
+            yield metadata_store.record(row)
+        else:
+            yield vectorstore.docstore.search(vectorstore.index_to_docstore_id[row]).metadata
+
+
+def iter_page_contents(vectorstore) -> Iterator[str]:
+    """page_content of every row, in FAISS row order, for either docstore kind"""
+    metadata_store = get_metadata_store(vectorstore)
+    for row in range(vectorstore.index.ntotal):
+        if metadata_store is not None:
+            yield metadata_store.content.get(row)
+        else:
+            yield vectorstore.docstore.search(vectorstore.index_to_docstore_id[row]).page_content
@@ -0,0 +1,335 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Counters and histograms are updated on the hot path with a lock and a dict
+lookup; cache hit rates and other existing stats are read at scrape time.
+Served at GET /api/metrics.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 4, 8, 15, 30, 60, 120, 240)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+WAIT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+Sample = Tuple[str, Dict[str, str], float]  # (name suffix, labels, value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield "", dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}  # key -> [bucket counts, sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in series:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield "_bucket", {**labels, "le": "+Inf"}, count
+            yield "_sum", labels, total
+            yield "_count", labels, count
+
+
+# (name, type, help, samples) produced at scrape time
+CollectedMetric = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[CollectedMetric]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[CollectedMetric]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+NODE_LATENCY = registry.histogram(
+    "rag_node_duration_seconds", "Wall time per graph node", ["node"]
+)
+LLM_REQUESTS = registry.counter(
+    "rag_llm_requests_total", "LLM calls by purpose and outcome", ["call", "status"]
+)
+LLM_LATENCY = registry.histogram(
+    "rag_llm_request_duration_seconds", "LLM call latency", ["call"]
+)
+LLM_TOKENS = registry.counter(
+    "rag_llm_tokens_total", "Tokens reported by the LLM API", ["call", "kind"]
+)
+FAISS_SEARCH_LATENCY = registry.histogram(
+    "rag_faiss_search_seconds", "Time inside index.search", ["kind"]
+)
+LEXICAL_SEARCH_LATENCY = registry.histogram(
+    "rag_lexical_search_seconds", "Time inside the BM25 index search"
+)
+RETRIEVALS = registry.counter(
+    "rag_retrievals_total", "query_vector_store calls by retriever that answered: vector, hybrid or lexical", ["path"]
+)
+EMBEDDING_BATCH_SIZE = registry.histogram(
+    "rag_embedding_batch_size", "Distinct queries per micro-batched embedding forward pass", buckets=BATCH_BUCKETS
+)
+EMBEDDING_QUEUE_WAIT = registry.histogram(
+    "rag_embedding_queue_wait_seconds", "Time a query waited for its micro-batch to start", buckets=WAIT_BUCKETS
+)
+RESULT_COUNT = registry.histogram(
+    "rag_result_count", "Results per search and recommendations per request", ["stage"], COUNT_BUCKETS
+)
+INTENT_SOURCE = registry.counter(
+    "rag_intent_source_total", "Where analyse_promt got the intent from: rules, cache or llm", ["source"]
+)
+SINGLE_FLIGHT_REQUESTS = registry.counter(
+    "rag_single_flight_requests_total", "Calls that ran (leader) or joined an identical in-flight call (coalesced)",
+    ["flight", "role"]
+)
+CASCADE_REQUESTS = registry.counter(
+    "rag_cascade_requests_total", "Recommendation requests by requested mode and serving pipeline", ["mode", "pipeline"]
+)
+CASCADE_ESCALATIONS = registry.counter(
+    "rag_cascade_escalations_total", "auto-mode requests escalated to the LLM pipeline, by reason", ["reason"]
+)
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Counts, times and token-sums every call of the chat model it is attached to"""
+
+    run_inline = True
+
+    def __init__(self, call: str):
+        self.call = call
+        self._started: Dict = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id, "ok")
+        prompt_tokens, completion_tokens = _token_usage(response)
+        if prompt_tokens:
+            LLM_TOKENS.inc(prompt_tokens, call=self.call, kind="prompt")
+        if completion_tokens:
+            LLM_TOKENS.inc(completion_tokens, call=self.call, kind="completion")
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, "error")
+
+    def _finish(self, run_id, status: str) -> None:
+        started = self._started.pop(run_id, None)
+        LLM_REQUESTS.inc(call=self.call, status=status)
+        if started is not None:
+            LLM_LATENCY.observe(time.perf_counter() - started, call=self.call)
+
+
+def _token_usage(response) -> Tuple[int, int]:
+    """(prompt, completion) tokens from an LLMResult - usage_metadata also covers streamed calls"""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+def _cache_metrics() -> Iterable[CollectedMetric]:
+    """Hit/miss counters of the caches that exist in this process"""
+    import sys
+
+    caches: Dict[str, Optional[Dict[str, int]]] = {}
+    from rag.vector_store_registry import get_vector_store_registry
+    vector_store_registry = get_vector_store_registry()
+    if vector_store_registry is not None and vector_store_registry.is_loaded:
+        embedding_cache = getattr(vector_store_registry.embeddings, "cache", None)
+        if embedding_cache is not None:
+            caches["query_embedding"] = embedding_cache.stats()
+    # Only report caches that were created; importing their modules here would create them
+    intent_module = sys.modules.get("rag.analazye_promt")
+    if intent_module is not None and intent_module._intent_cache is not None:
+        stats = intent_module._intent_cache.stats()
+        caches["intent"] = {
+            "hits": stats["exact_hits"] + stats["near_hits"],
+            "misses": stats["misses"],
+            "size": stats["exact_size"],
+        }
+    explain_module = sys.modules.get("rag.nodes.explain_recommendations_node")
+    if explain_module is not None and explain_module._explanation_cache is not None:
+        caches["explanation"] = explain_module._explanation_cache.stats()
+    response_module = sys.modules.get("rag.response_cache")
+    if response_module is not None and response_module._response_cache is not None:
+        caches["response"] = response_module._response_cache.stats()
+    speculative_module = sys.modules.get("rag.nodes.speculative_search_node")
+    if speculative_module is not None:
+        caches["speculative_search"] = speculative_module.speculative_search_stats.snapshot()
+
+    hits, misses, ratios, sizes = [], [], [], []
+    for name, stats in caches.items():
+        labels = {"cache": name}
+        total = stats["hits"] + stats["misses"]
+        hits.append((labels, stats["hits"]))
+        misses.append((labels, stats["misses"]))
+        ratios.append((labels, stats["hits"] / total if total else 0.0))
+        if "size" in stats:
+            sizes.append((labels, stats["size"]))
+    yield "rag_cache_hits_total", "counter", "Cache hits", hits
+    yield "rag_cache_misses_total", "counter", "Cache misses", misses
+    yield "rag_cache_hit_ratio", "gauge", "Hits / (hits + misses) since start", ratios
+    yield "rag_cache_entries", "gauge", "Entries currently cached", sizes
+
+
+def _cascade_metrics() -> Iterable[CollectedMetric]:
+    import sys
+
+    cascade_module = sys.modules.get("rag.agent.cascade")
+    if cascade_module is None:
+        return
+    stats = cascade_module.cascade_stats.snapshot()
+    yield "rag_cascade_escalation_ratio", "gauge", "Share of auto-mode requests escalated to the LLM pipeline", [
+        ({}, stats["escalation_rate"])
+    ]
+
+
+def _llm_connection_metrics() -> Iterable[CollectedMetric]:
+    import sys
+
+    llm_module = sys.modules.get("rag.llm_clients")
+    if llm_module is None or llm_module._pool is None:
+        return
+    stats = llm_module._pool.connection_stats()
+    yield "rag_llm_http_requests_total", "counter", "HTTP requests sent to the LLM API", [({}, stats["requests"])]
+    yield "rag_llm_connections_opened_total", "counter", "TCP connections opened to the LLM API", [
+        ({}, stats["connections_opened"])
+    ]
+
+
+registry.register_collector(_cache_metrics)
+registry.register_collector(_cascade_metrics)
+registry.register_collector(_llm_connection_metrics)
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text format"""
+    return registry.render()
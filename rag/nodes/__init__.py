@@ -1,14 +1,29 @@
-from rag.nodes.analyze_intent_node import analyze_intent_node
-from rag.nodes.search_products_node import search_products_node
+from rag.nodes.analyze_intent_node import analyze_intent_node, aanalyze_intent_node
+from rag.nodes.speculative_search_node import (
+    speculative_search_node,
+    aspeculative_search_node,
+    speculative_search_stats,
+)
+from rag.nodes.search_products_node import search_products_node, asearch_products_node
 from rag.nodes.refine_results_node import refine_results_node
-from rag.nodes.explain_recommendations_node import explain_recommendations_node
+from rag.nodes.explain_recommendations_node import (
+    explain_recommendations_node,
+    aexplain_recommendations_node,
+    astream_explanation,
+)
 from rag.nodes.format_response_node import format_response_node
 
 __all__ = [
     "analyze_intent_node",
+    "aanalyze_intent_node",
+    "speculative_search_node",
+    "aspeculative_search_node",
+    "speculative_search_stats",
     "search_products_node",
+    "asearch_products_node",
     "refine_results_node",
     "explain_recommendations_node",
+    "aexplain_recommendations_node",
+    "astream_explanation",
     "format_response_node",
 ]
-
@@ -1,14 +1,30 @@
+import logging
+from typing import Any, Dict
 from rag.agent.state import AgentState
-from rag.analazye_promt import analyse_promt
+from rag.analazye_promt import analyse_promt, aanalyse_promt
 
+logger = logging.getLogger(__name__)
 
-def analyze_intent_node(state: AgentState) -> AgentState:
-    """Node 1: Analyze user query to understand intent"""
-    print("🤖 Analyzing intent...")
+
+def analyze_intent_node(state: AgentState, vectorstore=None) -> Dict[str, Any]:
+    """
+    Node 1: Analyze user query to understand intent.
+    
+    Returns only the key it owns so it can run in parallel with the speculative search.
+    """
+    logger.debug("🤖 Analyzing intent...")
     
-    analyzed = analyse_promt(state["query"])
-    state["analyzed_intent"] = analyzed
+    analyzed = analyse_promt(state["query"], vectorstore=vectorstore)
     
-    print(f"   Product: {analyzed.product}, Intent: {analyzed.intent}")
-    return state
+    logger.debug("   Product: %s, Intent: %s", analyzed.product, analyzed.intent)
+    return {"analyzed_intent": analyzed}
+
 
+async def aanalyze_intent_node(state: AgentState, vectorstore=None) -> Dict[str, Any]:
+    """Node 1 (async): Analyze user query to understand intent"""
+    logger.debug("🤖 Analyzing intent...")
+    
+    analyzed = await aanalyse_promt(state["query"], vectorstore=vectorstore)
+    
+    logger.debug("   Product: %s, Intent: %s", analyzed.product, analyzed.intent)
+    return {"analyzed_intent": analyzed}
@@ -1,38 +1,135 @@
-from langchain_openai import ChatOpenAI
+import logging
+
 from rag.agent.state import AgentState
+from rag.llm_clients import get_llm_client_pool
 from config.settings import settings
 
+logger = logging.getLogger(__name__)
 
-def explain_recommendations_node(state: AgentState) -> AgentState:
-    """Node 4: Generate explanation for recommendations"""
-    print("💬 Generating explanation...")
-    
-    recommendations = state["recommendations"]
-    query = state["query"]
-    
-    if not recommendations:
-        state["explanation"] = "No products found matching your criteria."
-        return state
+NO_RESULTS_EXPLANATION = "No products found matching your criteria."
+
+_explanation_cache = None
+
+
+def get_explanation_cache():
+    """Process-wide explanation cache (None when EXPLANATION_CACHE_SIZE is 0)"""
+    global _explanation_cache
+    if _explanation_cache is None and settings.EXPLANATION_CACHE_SIZE > 0:
+        from rag.explanation_cache import ExplanationCache
+        _explanation_cache = ExplanationCache(max_size=settings.EXPLANATION_CACHE_SIZE)
+    return _explanation_cache
+
+
+def _lookup_cached_explanation(query, recommendations):
+    """Return (cache, key, catalog_version, cached explanation or None)"""
+    cache = get_explanation_cache()
+    if cache is None:
+        return None, None, None, None
     
-    # Simple explanation
+    from rag.explanation_cache import get_catalog_version
+    key = cache.make_key(
+        query,
+        recommendations[:settings.MAX_RECOMMENDATIONS_TO_EXPLAIN],
+        settings.LLM_MODEL,
+        settings.LLM_TEMPERATURE
+    )
+    catalog_version = get_catalog_version()
+    return cache, key, catalog_version, cache.get(key, catalog_version)
+
+
+def _build_explanation_prompt(query, recommendations):
+    """Build the LLM prompt describing the top recommendations"""
     products_text = "\n".join([
         f"- {r.get('name')} (${r.get('price', 0)})"
         for r in recommendations[:settings.MAX_RECOMMENDATIONS_TO_EXPLAIN]
     ])
     
-    prompt = f"""User asked: "{query}"
+    return f"""User asked: "{query}"
 
 Top products:
 {products_text}
 
 Explain in 2 sentences why these match the user's needs."""
+
+
+def explain_recommendations_node(state: AgentState) -> AgentState:
+    """Node 4: Generate explanation for recommendations"""
+    logger.debug("💬 Generating explanation...")
     
-    llm = ChatOpenAI(
-        model=settings.LLM_MODEL,
-        temperature=settings.LLM_TEMPERATURE
-    )
+    recommendations = state["recommendations"]
+    query = state["query"]
+    
+    if not recommendations:
+        state["explanation"] = NO_RESULTS_EXPLANATION
+        return state
+    
+    # Simple explanation (repeat query + same top products skips the LLM)
+    cache, key, catalog_version, cached = _lookup_cached_explanation(query, recommendations)
+    if cached is not None:
+        state["explanation"] = cached
+        return state
+    
+    prompt = _build_explanation_prompt(query, recommendations)
+    
+    llm = get_llm_client_pool().explanation_llm
     response = llm.invoke(prompt)
     
     state["explanation"] = response.content.strip()
+    if cache is not None:
+        cache.set(key, state["explanation"], catalog_version)
+    return state
+
+
+async def aexplain_recommendations_node(state: AgentState) -> AgentState:
+    """Node 4 (async): Generate explanation for recommendations"""
+    logger.debug("💬 Generating explanation...")
+    
+    recommendations = state["recommendations"]
+    query = state["query"]
+    
+    if not recommendations:
+        state["explanation"] = NO_RESULTS_EXPLANATION
+        return state
+    
+    cache, key, catalog_version, cached = _lookup_cached_explanation(query, recommendations)
+    if cached is not None:
+        state["explanation"] = cached
+        return state
+    
+    prompt = _build_explanation_prompt(query, recommendations)
+    
+    llm = get_llm_client_pool().explanation_llm
+    response = await llm.ainvoke(prompt)
+    
+    state["explanation"] = response.content.strip()
+    if cache is not None:
+        cache.set(key, state["explanation"], catalog_version)
     return state
 
+
+async def astream_explanation(query, recommendations):
+    """
+    Yield the explanation as text deltas from a streaming LLM call.
+    
+    Cached explanations are yielded as a single delta; streamed ones are cached
+    once complete, exactly like aexplain_recommendations_node.
+    """
+    if not recommendations:
+        yield NO_RESULTS_EXPLANATION
+        return
+    
+    cache, key, catalog_version, cached = _lookup_cached_explanation(query, recommendations)
+    if cached is not None:
+        yield cached
+        return
+    
+    prompt = _build_explanation_prompt(query, recommendations)
+    llm = get_llm_client_pool().explanation_llm
+    parts = []
+    async for chunk in llm.astream(prompt):
+        if chunk.content:
+            parts.append(chunk.content)
+            yield chunk.content
+    
+    if cache is not None:
+        cache.set(key, "".join(parts).strip(), catalog_version)
@@ -1,10 +1,15 @@
+import logging
 from typing import Dict, Any
 from rag.agent.state import AgentState
+from rag.metrics import RESULT_COUNT
+
+logger = logging.getLogger(__name__)
 
 
 def format_response_node(state: AgentState) -> AgentState:
     """Node 5: Format the final response"""
-    print("📋 Formatting response...")
+    logger.debug("📋 Formatting response...")
+    RESULT_COUNT.observe(len(state["recommendations"]), stage="recommendations")
     
     formatted_response: Dict[str, Any] = {
         "query": state["query"],
@@ -1,6 +1,12 @@
+import logging
+
 from rag.agent.state import AgentState
+from rag.attribute_index import get_attribute_index
+from rag.filters import SearchFilter
 from config.settings import settings
 
+logger = logging.getLogger(__name__)
+
 
 def refine_results_node(state: AgentState) -> AgentState:
     """
@@ -10,9 +16,25 @@ def refine_results_node(state: AgentState) -> AgentState:
     so we only apply hard constraints like price ranges here.
     Category matching is lenient since vector search already found relevant products.
     """
-    print("✨ Refining results...")
+    logger.debug("✨ Refining results...")
     
     intent = state["analyzed_intent"]
+    candidates = state.get("search_candidates")
+    if candidates is not None:
+        # One vectorized price mask over the candidate row ids; dicts are only
+        # built for the survivors we return. Category stays lenient (see below)
+        if intent and intent.price_range:
+            price_filter = SearchFilter(
+                min_price=intent.price_range.get("min", 0),
+                max_price=intent.price_range.get("max", float("inf")),
+            )
+            candidates = candidates.select(
+                price_filter.mask(get_attribute_index(candidates.vectorstore), candidates.row_ids)
+            )
+        state["recommendations"] = candidates.head(settings.MAX_RECOMMENDATIONS_TO_RETURN).to_results()
+        logger.debug("   %d recommendations", len(state["recommendations"]))
+        return state
+    
     results = state["search_results"]
     filtered = []
     
@@ -52,6 +74,6 @@ def refine_results_node(state: AgentState) -> AgentState:
     
     # Take top results based on config
     state["recommendations"] = filtered[:settings.MAX_RECOMMENDATIONS_TO_RETURN]
-    print(f"   {len(state['recommendations'])} recommendations")
+    logger.debug("   %d recommendations", len(state["recommendations"]))
     return state
 
@@ -1,11 +1,22 @@
+import logging
+
 from rag.agent.state import AgentState
-from rag.query import query_vector_store
+from rag.adaptive_search import filtered_search
+from rag.attribute_index import get_attribute_index
+from rag.executors import run_cpu_bound
+from rag.filters import SearchFilter
+from rag.nodes.speculative_search_node import (
+    can_reuse_speculative_results,
+    speculative_search_stats,
+)
 from config.settings import settings
 
+logger = logging.getLogger(__name__)
+
 
 def search_products_node(state: AgentState, vectorstore) -> AgentState:
     """Node 2: Search products using vector store"""
-    print("🔍 Searching products...")
+    logger.debug("🔍 Searching products...")
     
     intent = state["analyzed_intent"]
     
@@ -17,17 +28,42 @@ def search_products_node(state: AgentState, vectorstore) -> AgentState:
     else:
         search_query = state["query"]
     
-    print("search_query: ", search_query)
+    logger.debug("search_query: %s", search_query)
+    
+    # Price constraints are pushed into FAISS (or over-fetched adaptively) so
+    # top-k is taken among matching products
+    search_filter = SearchFilter.from_intent(intent)
+    
+    # Speculative mode: the raw query was already searched while the LLM ran
+    speculative = state.get("speculative_candidates")
+    if speculative is not None:
+        reuse = can_reuse_speculative_results(state["query"], search_query, speculative.vectorstore)
+        if reuse and search_filter is not None:
+            # The speculative search was unfiltered; only reuse it if enough results survive
+            attribute_index = get_attribute_index(speculative.vectorstore)
+            speculative = speculative.select(search_filter.mask(attribute_index, speculative.row_ids))
+            reuse = len(speculative) >= settings.MAX_RECOMMENDATIONS_TO_RETURN
+        speculative_search_stats.record(reuse)
+        if reuse:
+            state["search_candidates"] = speculative
+            logger.debug("   Reused %d speculative results", len(speculative))
+            return state
+    
     # Search using config values
-    results = query_vector_store(
+    candidates = filtered_search(
         search_query,
-        vectorstore=vectorstore,
+        vectorstore,
+        search_filter,
         k=settings.DEFAULT_SEARCH_K,
-        format_results=True,
+        target=settings.MAX_RECOMMENDATIONS_TO_RETURN,
         max_score=settings.MAX_SIMILARITY_SCORE
     )
     
-    state["search_results"] = results
-    print(f"   Found {len(results)} products")
+    state["search_candidates"] = candidates
+    logger.debug("   Found %d products", len(candidates))
     return state
 
+
+async def asearch_products_node(state: AgentState, vectorstore) -> AgentState:
+    """Node 2 (async): Run the embedding + FAISS search on the bounded CPU pool"""
+    return await run_cpu_bound(search_products_node, state, vectorstore=vectorstore)
@@ -0,0 +1,86 @@
+import logging
+import threading
+from typing import Dict
+
+import numpy as np
+
+from rag.agent.state import AgentState
+from rag.cache import normalize_query
+from rag.candidates import SearchCandidates
+from rag.query import search_rows
+from rag.executors import run_cpu_bound
+from rag.vector_store_registry import resolve_vector_store
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeSearchStats:
+    """How often the speculative raw-query search could be reused"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+speculative_search_stats = SpeculativeSearchStats()
+
+
+def speculative_search_node(state: AgentState, vectorstore) -> Dict:
+    """
+    Node 1b: Search on the raw query while analyze_intent_node waits on the LLM.
+    
+    Runs in parallel with "analyze", so it only returns its own key.
+    """
+    logger.debug("🔮 Speculative search on raw query...")
+    vectorstore = resolve_vector_store(vectorstore)
+    row_ids, scores = search_rows(
+        state["query"],
+        vectorstore,
+        k=settings.DEFAULT_SEARCH_K,
+        max_score=settings.MAX_SIMILARITY_SCORE
+    )
+    return {"speculative_candidates": SearchCandidates(row_ids, scores, vectorstore)}
+
+
+async def aspeculative_search_node(state: AgentState, vectorstore) -> Dict:
+    """Node 1b (async): speculative search on the bounded CPU pool"""
+    return await run_cpu_bound(speculative_search_node, state, vectorstore=vectorstore)
+
+
+def can_reuse_speculative_results(raw_query: str, search_query: str, vectorstore) -> bool:
+    """
+    True when the refined search query embeds close enough to the raw query
+    that searching again would return (nearly) the same products.
+    """
+    if normalize_query(raw_query) == normalize_query(search_query):
+        return True
+    
+    embeddings = resolve_vector_store(vectorstore).embeddings
+    if embeddings is None:
+        return False
+    # Both embeddings go through the query cache; the raw one is already there
+    raw_vector = np.asarray(embeddings.embed_query(raw_query), dtype=np.float32)
+    search_vector = np.asarray(embeddings.embed_query(search_query), dtype=np.float32)
+    denominator = np.linalg.norm(raw_vector) * np.linalg.norm(search_vector)
+    if not denominator:
+        return False
+    cosine_distance = 1.0 - float(raw_vector @ search_vector) / denominator
+    return cosine_distance <= settings.SPECULATIVE_REUSE_MAX_COSINE_DISTANCE
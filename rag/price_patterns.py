@@ -0,0 +1,45 @@
+import re
+from typing import Optional, Tuple
+
+CURRENCY_WORD = r'(?:dollars?|usd|bucks)\b'
+# Optional trailing currency word, consumed with the number so "under 200 dollars" strips cleanly
+CURRENCY_SUFFIX = r'(?:\s*' + CURRENCY_WORD + r')?'
+# Price bounds written in the query, e.g. "under $200", "from 50"
+MAX_PRICE_PATTERN = re.compile(r'(?:under|below|less than|max|maximum|up to)\s*\$?(\d+)' + CURRENCY_SUFFIX)
+# A bare "from 20 to 30" is a span of something, not a minimum price
+MIN_PRICE_PATTERN = re.compile(
+    r'(?:over|above|more than|min|minimum|from)\s*\$?(\d+)(?!\d|\s*(?:and|to|-)\s*\d)' + CURRENCY_SUFFIX
+)
+# "between $50 and $80", "$50-$80", "from 50 to 80 dollars"; a range only counts as a price
+# when it carries a currency marker ("between 2 and 4 people", "from 20 to 30 hours" don't)
+RANGE_PATTERN = re.compile(
+    r'(?:between|from)\s*\$(\d+)\s*(?:and|to|-)\s*\$?(\d+)' + CURRENCY_SUFFIX
+    + r'|(?:between|from)\s*(\d+)\s*(?:and|to|-)\s*(?:\$(\d+)' + CURRENCY_SUFFIX + r'|(\d+)\s*' + CURRENCY_WORD + r')'
+    + r'|\$(\d+)\s*(?:-|to)\s*\$?(\d+)' + CURRENCY_SUFFIX
+    + r'|\b(\d+)\s*(?:-|to)\s*(\d+)\s*' + CURRENCY_WORD
+)
+# Any mention of money or budget, parsed or not
+MONEY_PATTERN = re.compile(
+    r'[$€£]|\b\d+\s*(?:dollars?|usd|bucks|euros?)\b'
+    r'|\b(?:budget|price[ds]?|pricing|cheap\w*|affordable|expensive|cost\w*)\b'
+)
+
+
+def parse_price_bounds(query: str) -> Tuple[Optional[float], Optional[float]]:
+    """Return (min_price, max_price) found in query; None for a missing bound"""
+    query = query.lower()
+    range_match = RANGE_PATTERN.search(query)
+    if range_match:
+        low, high = [float(v) for v in range_match.groups() if v is not None]
+        return min(low, high), max(low, high)
+    max_match = MAX_PRICE_PATTERN.search(query)
+    min_match = MIN_PRICE_PATTERN.search(query)
+    return (
+        float(min_match.group(1)) if min_match else None,
+        float(max_match.group(1)) if max_match else None,
+    )
+
+
+def mentions_money(query: str) -> bool:
+    """True if query talks about price at all (e.g. "between $50 and $80", "cheap")"""
+    return MONEY_PATTERN.search(query.lower()) is not None
@@ -1,16 +1,159 @@
-def query_vector_store(query, vectorstore, k=5, format_results=True, max_score=None):
+import logging
+
+import numpy as np
+
+from config.settings import settings
+from rag.cache import normalize_query
+from rag.metrics import FAISS_SEARCH_LATENCY, LEXICAL_SEARCH_LATENCY, RESULT_COUNT, RETRIEVALS
+from rag.metadata_store import get_metadata_store
+from rag.vector_store_registry import resolve_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+def _prepare_query_vectors(vectorstore, vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    if vectorstore._normalize_L2:
+        import faiss
+        faiss.normalize_L2(vectors)
+    return vectors
+
+
+def search_rows(query, vectorstore, k, max_score=None, search_filter=None):
+    """
+    Embed query and search the FAISS index directly.
+
+    Returns (row_ids, scores) numpy arrays with padding and (optionally)
+    matches above max_score removed, best first.
+    With a SearchFilter, FAISS only considers rows that pass the predicates,
+    so the top-k is taken among matching products.
+    """
+    params, keepalive = None, None
+    if search_filter is not None and not search_filter.is_empty():
+        from rag.attribute_index import get_attribute_index
+        from rag.filters import build_search_params
+        keep = search_filter.mask(get_attribute_index(vectorstore))
+        if not keep.any():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if not keep.all():
+            params, keepalive = build_search_params(vectorstore.index, keep)
+    
+    vector = _prepare_query_vectors(vectorstore, vectorstore.embeddings.embed_query(query))
+    with FAISS_SEARCH_LATENCY.time(kind="single"):
+        scores, row_ids = vectorstore.index.search(vector, k, params=params)
+    del keepalive
+    scores, row_ids = scores[0], row_ids[0]
+    keep = row_ids >= 0
+    if max_score is not None:
+        keep &= scores <= max_score
+    RESULT_COUNT.observe(int(keep.sum()), stage="search")
+    return row_ids[keep], scores[keep]
+
+
+RETRIEVAL_MODES = ("vector", "hybrid")
+
+
+def _reciprocal_rank_fusion(rankings, k, rrf_k):
+    """Fuse best-first row id arrays: score = sum of 1 / (rrf_k + rank); returns the top k (row_ids, scores)"""
+    rankings = [ranking for ranking in rankings if len(ranking)]
+    if not rankings:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    rows = np.concatenate(rankings)
+    contributions = np.concatenate([1.0 / (rrf_k + np.arange(1, len(ranking) + 1)) for ranking in rankings])
+    unique_rows, inverse = np.unique(rows, return_inverse=True)
+    fused = np.bincount(inverse, weights=contributions)
+    order = np.lexsort((unique_rows, -fused))[:k]  # best first, ties by row id
+    return unique_rows[order], fused[order].astype(np.float32)
+
+
+def hybrid_search_rows(query, vectorstore, k, max_score=None, search_filter=None):
+    """
+    BM25 + vector search fused with reciprocal rank fusion.
+    
+    Returns (row_ids, scores, path), best first. When the top BM25 hit contains
+    the query's terms (HYBRID_LEXICAL_MIN_COVERAGE) and BM25 alone has k hits,
+    path is "lexical" and the BM25 ranking is returned without embedding the
+    query; otherwise path is "hybrid" and scores are RRF scores (higher is better).
+    max_score only applies to the vector candidates.
+    """
+    from rag.lexical_index import get_lexical_index
+
+    depth = max(k, settings.HYBRID_CANDIDATES)
+    lexical_index = get_lexical_index(vectorstore)
+    with LEXICAL_SEARCH_LATENCY.time():
+        lexical_rows, lexical_scores = lexical_index.search(query, depth)
+    if search_filter is not None and not search_filter.is_empty() and len(lexical_rows):
+        from rag.attribute_index import get_attribute_index
+        keep = search_filter.mask(get_attribute_index(vectorstore), row_ids=lexical_rows)
+        lexical_rows, lexical_scores = lexical_rows[keep], lexical_scores[keep]
+
+    if (
+        len(lexical_rows) >= k
+        and lexical_index.coverage(query, int(lexical_rows[0])) >= settings.HYBRID_LEXICAL_MIN_COVERAGE
+    ):
+        return lexical_rows[:k], lexical_scores[:k], "lexical"
+
+    vector_rows, _ = search_rows(query, vectorstore, depth, max_score=max_score, search_filter=search_filter)
+    row_ids, scores = _reciprocal_rank_fusion([lexical_rows, vector_rows], k, settings.HYBRID_RRF_K)
+    return row_ids, scores, "hybrid"
+
+
+def query_vector_store(
+    query, vectorstore, k=5, format_results=True, max_score=None, fields=None, search_filter=None, mode=None
+):
     """
     Query the vectorstore and optionally filter by similarity score.
     
     Args:
         query: Search query string
-        vectorstore: FAISS vectorstore object
+        vectorstore: FAISS vectorstore object, or a VectorStoreRegistry to borrow the live store from
         k: Number of results to return
         format_results: Whether to format results
         max_score: Maximum similarity score threshold (lower is better, so this filters out bad matches)
                    If None, no filtering is applied
+        fields: Optional list of fields to return (columnar metadata store only; default all)
+        search_filter: Optional SearchFilter pushed down into the FAISS search
+        mode: "vector" or "hybrid" (see hybrid_search_rows); default RETRIEVAL_MODE.
+              Hybrid results report score_type "rrf_score" (or "bm25_score" when
+              answered lexically), where higher is better.
     """
-    print(f"\nQuery: '{query}'")
+    logger.debug("Query: %r", query)
+    vectorstore = resolve_vector_store(vectorstore)
+    mode = mode or settings.RETRIEVAL_MODE
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode {mode!r}; expected one of {', '.join(RETRIEVAL_MODES)}")
+    
+    # Columnar store: go by row id and only build dicts for what we return
+    metadata_store = get_metadata_store(vectorstore)
+    if mode == "hybrid" or (metadata_store is not None and format_results) or search_filter is not None:
+        if mode == "hybrid":
+            row_ids, scores, path = hybrid_search_rows(
+                query, vectorstore, k, max_score=max_score, search_filter=search_filter
+            )
+            score_type = "bm25_score" if path == "lexical" else "rrf_score"
+        else:
+            row_ids, scores = search_rows(
+                query, vectorstore, k, max_score=max_score, search_filter=search_filter
+            )
+            path, score_type = "vector", None
+            if len(row_ids) == 0 and max_score is not None:
+                logger.info("⚠️  No results found below score threshold of %s", max_score)
+        RETRIEVALS.inc(path=path)
+        if metadata_store is not None and format_results:
+            from rag.format_data import format_row_results
+            return format_row_results(metadata_store, row_ids, scores, fields=fields, score_type=score_type)
+        results = [
+            (vectorstore.docstore.search(vectorstore.index_to_docstore_id[int(row)]), float(score))
+            for row, score in zip(row_ids, scores)
+        ]
+        if format_results:
+            from rag.format_data import format_search_results
+            return format_search_results(results, score_type=score_type)
+        return results
+    
+    RETRIEVALS.inc(path="vector")
     results = vectorstore.similarity_search_with_score(query, k=k)
     
 
@@ -18,12 +161,67 @@ def query_vector_store(query, vectorstore, k=5, format_results=True, max_score=N
     if max_score is not None:
         filtered_results = [(doc, score) for doc, score in results if score <= max_score]
         if not filtered_results:
-            print(f"⚠️  No results found below score threshold of {max_score}")
+            logger.info("⚠️  No results found below score threshold of %s", max_score)
         else:
-            print(f"✅ Filtered {len(results)} results to {len(filtered_results)} below score {max_score}")
+            logger.debug("✅ Filtered %d results to %d below score %s", len(results), len(filtered_results), max_score)
         results = filtered_results
     
     if format_results:
         from rag.format_data import format_search_results
         return format_search_results(results)
     return results
+
+
+def query_vector_store_batch(queries, vectorstore, k=5, format_results=True, max_score=None):
+    """
+    Batch variant of query_vector_store - returns one result list per query, in input order.
+    
+    All queries are embedded in a single embed_documents() forward pass and searched
+    with one multi-query FAISS call. max_score filtering is applied as a mask over the
+    whole (queries x k) score matrix, and each matched document is fetched once even
+    when several queries return it.
+    """
+    if not queries:
+        return []
+    logger.debug("Batch query: %d queries", len(queries))
+    vectorstore = resolve_vector_store(vectorstore)
+    
+    vectors = _prepare_query_vectors(
+        vectorstore,
+        vectorstore.embeddings.embed_documents([normalize_query(q) for q in queries])
+    )
+    with FAISS_SEARCH_LATENCY.time(kind="batch"):
+        scores, row_ids = vectorstore.index.search(vectors, k)
+    
+    # FAISS pads missing neighbours with -1
+    keep = row_ids >= 0
+    if max_score is not None:
+        keep &= scores <= max_score
+    
+    metadata_store = get_metadata_store(vectorstore)
+    if metadata_store is not None and format_results:
+        from rag.format_data import format_row_results
+        logger.debug("✅ %d results across %d queries", int(keep.sum()), len(queries))
+        return [
+            format_row_results(metadata_store, query_rows[query_keep], query_scores[query_keep])
+            for query_scores, query_rows, query_keep in zip(scores, row_ids, keep)
+        ]
+    
+    documents = {
+        row_id: vectorstore.docstore.search(vectorstore.index_to_docstore_id[row_id])
+        for row_id in np.unique(row_ids[keep]).tolist()
+    }
+    
+    batch_results = []
+    for query_scores, query_rows, query_keep in zip(scores, row_ids, keep):
+        results = [
+            (documents[row_id], score)
+            for row_id, score in zip(query_rows[query_keep].tolist(), query_scores[query_keep].tolist())
+        ]
+        batch_results.append(results)
+    logger.debug("✅ %d results across %d queries", int(keep.sum()), len(queries))
+    
+    if format_results:
+        from rag.format_data import format_search_results
+        return [format_search_results(results) for results in batch_results]
+    return batch_results
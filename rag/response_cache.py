@@ -0,0 +1,146 @@
+"""
+Response-level cache for the recommendation API.
+
+Stores the serialized JSON body of a response together with a strong ETag
+(hash of the body, so every worker agrees on it). Entries are fresh for
+RESPONSE_CACHE_TTL_SECONDS; for RESPONSE_CACHE_STALE_SECONDS after that they
+are still served while one background task recomputes them
+(stale-while-revalidate). Keys include the catalog version and the model
+settings, so a registry swap or a config change never serves old answers.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from config.settings import settings
+from rag.cache import LRUTTLCache
+from rag.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    stored_at: float
+
+
+@dataclass(frozen=True)
+class CacheLookup:
+    response: CachedResponse
+    status: str  # "hit", "stale" or "miss"
+    age: float
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def model_fingerprint() -> Tuple:
+    """Settings that change what a response contains"""
+    return (
+        settings.EMBEDDING_BACKEND,
+        settings.EMBEDDING_MODEL,
+        settings.LLM_MODEL,
+        settings.INTENT_LLM_MODEL,
+        settings.LLM_TEMPERATURE,
+        settings.MAX_SIMILARITY_SCORE,
+        settings.MAX_RECOMMENDATIONS_TO_RETURN,
+        settings.RECOMMENDATION_MODE,
+    )
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        stale_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._clock = clock
+        self._entries = LRUTTLCache(max_size=max_size, ttl_seconds=ttl_seconds + stale_seconds, clock=clock)
+        # Misses and background refreshes of the same key share one computation
+        self._flight = SingleFlight("response_cache")
+        self._refreshing: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.refresh_errors = 0
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[bytes]]) -> CacheLookup:
+        """
+        Cached response for key; on a miss compute() produces the body and is stored.
+        A stale entry is returned as-is and refreshed in the background.
+        """
+        entry: Optional[CachedResponse] = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry.stored_at
+            if age < self.ttl_seconds:
+                with self._lock:
+                    self.fresh_hits += 1
+                return CacheLookup(entry, "hit", age)
+            with self._lock:
+                self.stale_hits += 1
+            self._schedule_refresh(key, compute)
+            return CacheLookup(entry, "stale", age)
+
+        entry = await self._flight.ado(key, lambda: self._compute_and_store(key, compute))
+        return CacheLookup(entry, "miss", 0.0)
+
+    async def _compute_and_store(self, key: Hashable, compute: Callable[[], Awaitable[bytes]]) -> CachedResponse:
+        body = await compute()
+        entry = CachedResponse(body=body, etag=compute_etag(body), stored_at=self._clock())
+        self._entries.set(key, entry)
+        return entry
+
+    def _schedule_refresh(self, key: Hashable, compute: Callable[[], Awaitable[bytes]]) -> None:
+        async def refresh():
+            try:
+                await self._flight.ado(key, lambda: self._compute_and_store(key, compute))
+            except Exception as e:
+                with self._lock:
+                    self.refresh_errors += 1
+                logger.warning("⚠️  Background refresh of a cached response failed: %s", e)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._refreshing.add(task)  # keep a reference until it finishes
+        task.add_done_callback(self._refreshing.discard)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._entries.stats()
+        with self._lock:
+            fresh_hits, stale_hits, refresh_errors = self.fresh_hits, self.stale_hits, self.refresh_errors
+        return {
+            "size": entries["size"],
+            "max_size": entries["max_size"],
+            "hits": fresh_hits + stale_hits,
+            "stale_hits": stale_hits,
+            "misses": entries["misses"],
+            "refresh_errors": refresh_errors,
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide response cache (None when RESPONSE_CACHE_SIZE is 0)"""
+    global _response_cache
+    if _response_cache is None and settings.RESPONSE_CACHE_SIZE > 0:
+        _response_cache = ResponseCache(
+            max_size=settings.RESPONSE_CACHE_SIZE,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+            stale_seconds=settings.RESPONSE_CACHE_STALE_SECONDS,
+        )
+    return _response_cache
@@ -0,0 +1,210 @@
+"""
+Deterministic intent extraction for common query shapes.
+
+Produces the same understand_promt model as the LLM call in analyse_promt,
+from compiled patterns (price bounds, gift/comparison cues, filler phrases),
+the catalog gazetteer and - when installed - spaCy noun chunks. Every result
+carries a confidence; analyse_promt only trusts it at or above
+RULE_INTENT_MIN_CONFIDENCE and asks the LLM otherwise.
+"""
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from config.settings import settings
+from rag.gazetteer import Gazetteer
+from rag.price_patterns import (
+    MAX_PRICE_PATTERN,
+    MIN_PRICE_PATTERN,
+    RANGE_PATTERN,
+    mentions_money,
+    parse_price_bounds,
+)
+
+logger = logging.getLogger(__name__)
+
+RECIPIENTS = (
+    r"mom|mother|dad|father|parents?|wife|husband|girlfriend|boyfriend|partner|friend|"
+    r"sister|brother|son|daughter|kids?|child|children|coworker|colleague|boss|"
+    r"grandma|grandmother|grandpa|grandfather|teacher|him|her|them"
+)
+GIFT_PATTERN = re.compile(
+    r"\b(?:gifts?|presents?|birthday|christmas|xmas|anniversary|valentine'?s?|stocking stuffer)\b"
+    rf"|\bfor\s+(?:my\s+|a\s+|an\s+|his\s+|her\s+)?(?:{RECIPIENTS})\b"
+)
+COMPARISON_PATTERN = re.compile(
+    r"\b(?:vs\.?|versus|compare[ds]?|comparison|compared to|better than|difference between|which is better)\b"
+)
+NEED_PATTERN = re.compile(r"\b(?:i\s+need|we\s+need|need\s+(?:a|an|some|something)|suitable for|good for|help(?:s)? with)\b")
+NEGATION_PATTERN = re.compile(r"\b(?:not|no|without|except|excluding|isn't|doesn't|don't|never)\b")
+# Leading request phrasing, stripped (repeatedly) before looking for the product
+FILLER_PATTERN = re.compile(
+    r"^(?:i\s+(?:need|want|would like|am looking for|'m looking for|m looking for)|looking for|"
+    r"show me|find me|find|get me|search for|recommend(?:\s+me)?|suggest|can you (?:recommend|suggest|find)|"
+    r"what(?:'s| is| are)(?:\s+(?:the|a|some))?|please|best|good|great|top|some|any|a|an|the|new)\b\s*"
+)
+VAGUE_WORDS = {
+    "something", "anything", "stuff", "things", "thing", "item", "items", "product", "products", "ideas", "idea",
+    "gift", "gifts", "present", "presents",
+}
+POSSESSIVES = re.compile(r"^(?:my|a|an|the|his|her|our|their|your)\s+")
+FOR_CLAUSE = re.compile(r"(?:^|\s+)for\s+")
+
+
+@dataclass
+class RuleIntent:
+    intent: "object"  # understand_promt
+    confidence: float
+    signals: List[str] = field(default_factory=list)  # what moved the confidence, for debugging
+
+
+_nlp = None
+_nlp_loaded = False
+_nlp_lock = threading.Lock()
+
+
+def _get_spacy():
+    """spaCy pipeline for noun chunks, or None when spaCy/the model isn't installed or is disabled"""
+    global _nlp, _nlp_loaded
+    if not _nlp_loaded:
+        with _nlp_lock:
+            if not _nlp_loaded:
+                if settings.RULE_INTENT_SPACY_MODEL:
+                    try:
+                        import spacy
+                        _nlp = spacy.load(settings.RULE_INTENT_SPACY_MODEL, disable=["ner", "lemmatizer"])
+                    except (ImportError, OSError) as e:
+                        logger.info("spaCy unavailable for rule-based intents (%s); using patterns only", e)
+                _nlp_loaded = True
+    return _nlp
+
+
+def _strip_price_phrases(text: str) -> str:
+    for pattern in (RANGE_PATTERN, MAX_PRICE_PATTERN, MIN_PRICE_PATTERN):
+        text = pattern.sub(" ", text)
+    text = re.sub(r"\$\s*\d+|\b\d+\s*(?:dollars?|usd|bucks)\b", " ", text)
+    return re.sub(r"\s+", " ", text).strip(" ,.!?$")
+
+
+def _strip_fillers(text: str) -> str:
+    previous = None
+    while previous != text:
+        previous = text
+        text = FILLER_PATTERN.sub("", text).strip()
+    return " ".join(word for word in text.split() if word not in VAGUE_WORDS)
+
+
+def _noun_phrase(text: str, gazetteer: Optional[Gazetteer]) -> Optional[str]:
+    """Best spaCy noun chunk in text (one with a catalog term if any), None if spaCy is off"""
+    nlp = _get_spacy()
+    if nlp is None:
+        return None
+    chunks = [
+        " ".join(token.text for token in chunk if token.pos_ not in ("DET", "PRON"))
+        for chunk in nlp(text).noun_chunks
+    ]
+    chunks = [chunk for chunk in chunks if chunk]
+    if not chunks:
+        return ""
+    if gazetteer is not None:
+        for chunk in chunks:
+            if gazetteer.match_terms(chunk):
+                return chunk
+    return chunks[0]
+
+
+def extract_intent(query: str, gazetteer: Optional[Gazetteer] = None) -> RuleIntent:
+    """Parse query into understand_promt locally and score how much to trust it (0..1)"""
+    from rag.analazye_promt import understand_promt
+
+    text = query.lower().strip()
+    signals: List[str] = []
+    confidence = 0.0
+
+    # Price bounds
+    min_price, max_price = parse_price_bounds(text)
+    price_range = {}
+    if min_price is not None:
+        price_range["min"] = min_price
+    if max_price is not None:
+        price_range["max"] = max_price
+    if price_range:
+        confidence += 0.1
+        signals.append("price_parsed")
+    elif mentions_money(text):
+        confidence -= 0.5
+        signals.append("price_unparsed")
+
+    # Intent cues
+    if GIFT_PATTERN.search(text):
+        intent = "gift"
+    elif COMPARISON_PATTERN.search(text):
+        intent = "comparison"
+        confidence -= 0.3  # which products to compare is left to the LLM
+        signals.append("comparison")
+    elif NEED_PATTERN.search(text):
+        intent = "specific_need"
+    else:
+        intent = "search"
+    if NEGATION_PATTERN.search(text):
+        confidence -= 0.4
+        signals.append("negation")
+    if len(text.split()) > settings.RULE_INTENT_MAX_QUERY_WORDS:
+        confidence -= 0.2
+        signals.append("long_query")
+
+    # Product and use case: "<product> for <use case / recipient>"
+    core = _strip_fillers(_strip_price_phrases(text))
+    product_text, for_clause = (FOR_CLAUSE.split(core, maxsplit=1) + [""])[:2]
+    product_text = _strip_fillers(product_text)
+    use_case = None
+    if for_clause and not GIFT_PATTERN.search("for " + for_clause):
+        use_case = POSSESSIVES.sub("", for_clause).strip() or None
+
+    noun_phrase = _noun_phrase(product_text, gazetteer) if product_text else None
+    if noun_phrase == "":
+        confidence -= 0.2
+        signals.append("no_noun_chunk")
+    elif noun_phrase:
+        product_text = noun_phrase
+
+    # Gift queries often name only the recipient's interest: "gift for a coffee lover"
+    if not product_text and intent == "gift" and for_clause:
+        product_text = POSSESSIVES.sub("", for_clause).strip()
+        use_case = None
+
+    category, attributes = None, None
+    if product_text:
+        confidence += 0.5
+        signals.append("product")
+    if gazetteer is not None:
+        categories, brand = gazetteer.resolve(core)
+        if gazetteer.match_terms(product_text):
+            confidence += 0.25
+            signals.append("catalog_term")
+        if len(categories) == 1:
+            category = next(iter(categories))
+            confidence += 0.15
+            signals.append("category")
+        elif len(categories) > 1:
+            confidence -= 0.25
+            signals.append("ambiguous_category")
+        if brand:
+            attributes = {"brand": brand}
+        if use_case is None:
+            known_use_cases = gazetteer.match_use_cases(core)
+            if known_use_cases:
+                use_case = known_use_cases[0]
+
+    analyzed = understand_promt(
+        intent=intent,
+        category=category,
+        price_range=price_range or None,
+        attributes=attributes,
+        use_case=use_case,
+        product=product_text or query.strip(),
+    )
+    confidence = max(0.0, min(1.0, confidence))
+    return RuleIntent(analyzed, round(confidence, 3), signals)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from config.settings import settings
+from rag.create_vector_store import create_embeddings, create_load_vector_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRODUCTS_PATH = Path(__file__).parent.parent / "data" / "products.json"
+
+
+@dataclass(frozen=True)
+class VectorStoreHandle:
+    """Immutable snapshot of the live vectorstore and the model that embeds queries for it"""
+    vectorstore: FAISS
+    embeddings: Embeddings
+    version: int
+
+
+class VectorStoreRegistry:
+    """
+    Process-wide owner of the loaded FAISS store and embedding model.
+
+    Readers call current() once per request and keep using that snapshot, so a
+    swap() never changes the index underneath an in-flight search. Swapping only
+    rebinds a single attribute, which is atomic for readers.
+    """
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        products_path: Optional[Path] = None,
+        embeddings: Optional[Embeddings] = None,
+    ):
+        self.name = name or settings.VECTOR_STORE_NAME
+        self.products_path = products_path or DEFAULT_PRODUCTS_PATH
+        self._embeddings = embeddings
+        self._handle: Optional[VectorStoreHandle] = None
+        self._swap_lock = threading.Lock()
+
+    def load(self) -> VectorStoreHandle:
+        """Load the store from disk (building it if needed) and publish it as version 1"""
+        if self._embeddings is None:
+            self._embeddings = create_embeddings()
+        vectorstore = self._load_from_disk()
+        return self.swap(vectorstore)
+
+    def _load_from_disk(self) -> FAISS:
+        return create_load_vector_store(
+            name=self.name,
+            products_path=self.products_path,
+            embeddings=self._embeddings,
+        )
+
+    def current(self) -> VectorStoreHandle:
+        """Return the live snapshot"""
+        handle = self._handle
+        if handle is None:
+            raise RuntimeError("Vector store registry has not been loaded yet")
+        return handle
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._handle is not None
+
+    @property
+    def vectorstore(self) -> FAISS:
+        return self.current().vectorstore
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.current().embeddings
+
+    @property
+    def version(self) -> int:
+        handle = self._handle
+        return handle.version if handle else 0
+
+    def swap(
+        self,
+        vectorstore: FAISS,
+        expected_version: Optional[int] = None,
+    ) -> VectorStoreHandle:
+        """
+        Atomically replace the live vectorstore.
+
+        Args:
+            vectorstore: Fully built store to publish
+            expected_version: If given, only swap when the live version still matches
+                              (guards against two concurrent rebuilds overwriting each other)
+        """
+        with self._swap_lock:
+            if expected_version is not None and expected_version != self.version:
+                raise ValueError(
+                    f"Vector store version changed (expected {expected_version}, "
+                    f"live {self.version}); rebuild against the latest index"
+                )
+            handle = VectorStoreHandle(
+                vectorstore=vectorstore,
+                embeddings=self._embeddings,
+                version=self.version + 1,
+            )
+            self._handle = handle
+        logger.info("🔁 Vector store '%s' is now at version %d", self.name, handle.version)
+        return handle
+
+    def reload(self) -> VectorStoreHandle:
+        """Re-read the index from disk and swap it in, reusing the loaded embedding model"""
+        expected_version = self.version
+        vectorstore = self._load_from_disk()
+        return self.swap(vectorstore, expected_version=expected_version)
+
+
+_registry: Optional[VectorStoreRegistry] = None
+
+
+def create_vector_store_registry(
+    name: Optional[str] = None,
+    products_path: Optional[Path] = None,
+) -> VectorStoreRegistry:
+    """Create, load and install the process-wide registry"""
+    global _registry
+    registry = VectorStoreRegistry(name=name, products_path=products_path)
+    registry.load()
+    _registry = registry
+    return registry
+
+
+def get_vector_store_registry() -> Optional[VectorStoreRegistry]:
+    """Return the process-wide registry, or None if it hasn't been created"""
+    return _registry
+
+
+def resolve_vector_store(vectorstore) -> FAISS:
+    """Accept either a FAISS store or a registry and return the store to search"""
+    if isinstance(vectorstore, VectorStoreRegistry):
+        return vectorstore.vectorstore
+    return vectorstore
@@ -1,25 +1,47 @@
-from typing import Dict, Any
-from functools import partial
+from typing import Dict, Any, Optional
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 
+from rag.agent.runnables import graph_node
 from simple_rag.agent.simple_state import SimpleAgentState
 from simple_rag.nodes import (
     simple_search_node,
+    asimple_search_node,
     simple_refine_node,
     simple_explain_node,
     simple_format_node,
 )
 
 
+def _initial_state(query: str) -> SimpleAgentState:
+    return {
+        "query": query,
+        "search_results": [],
+        "search_candidates": None,
+        "recommendations": [],
+        "explanation": "",
+        "formatted_response": None
+    }
+
+
 def build_simple_recommendation_graph(vectorstore):
-    """Build simplified workflow graph - only 1 LLM call instead of 2"""
+    """
+    Build simplified workflow graph - only 1 LLM call instead of 2.
+    
+    vectorstore may be a FAISS store or a VectorStoreRegistry (see build_recommendation_graph).
+    Like the full graph, the returned run() has an async run.arun();
+    run.run_state()/run.arun_state() return the final state instead of the formatted response.
+    """
     workflow = StateGraph(SimpleAgentState)
     
     # Add nodes (no analyze_intent_node!)
-    workflow.add_node("search", partial(simple_search_node, vectorstore=vectorstore))
-    workflow.add_node("refine", simple_refine_node)
-    workflow.add_node("explain", simple_explain_node)
-    workflow.add_node("format", simple_format_node)
+    workflow.add_node(
+        "search",
+        graph_node(simple_search_node, asimple_search_node, vectorstore=vectorstore)
+    )
+    workflow.add_node("refine", graph_node(simple_refine_node))
+    workflow.add_node("explain", graph_node(simple_explain_node))
+    workflow.add_node("format", graph_node(simple_format_node))
     
     # Connect nodes - simpler linear flow
     workflow.add_edge(START, "search")
@@ -31,17 +53,25 @@ def build_simple_recommendation_graph(vectorstore):
     compiled_graph = workflow.compile()
     
     # Return a function that handles state creation and execution
-    def run(query: str) -> Dict[str, Any]:
-        """Execute the simple recommendation graph with a query"""
-        state: SimpleAgentState = {
-            "query": query,
-            "search_results": [],
-            "recommendations": [],
-            "explanation": "",
-            "formatted_response": None
-        }
-        final_state = compiled_graph.invoke(state)
+    def run(query: str, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        """Execute the simple recommendation graph with a query (config: e.g. callbacks)"""
+        final_state = run_state(query, config=config)
+        return final_state["formatted_response"] or {}
+    
+    def run_state(query: str, config: Optional[RunnableConfig] = None) -> SimpleAgentState:
+        """Like run, but return the whole final state (scores, candidates) for the cascade"""
+        return compiled_graph.invoke(_initial_state(query), config=config)
+    
+    async def arun(query: str, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        """Execute the simple recommendation graph without blocking the event loop"""
+        final_state = await arun_state(query, config=config)
         return final_state["formatted_response"] or {}
     
+    async def arun_state(query: str, config: Optional[RunnableConfig] = None) -> SimpleAgentState:
+        """Async run_state"""
+        return await compiled_graph.ainvoke(_initial_state(query), config=config)
+    
+    run.arun = arun
+    run.run_state = run_state
+    run.arun_state = arun_state
     return run
-
@@ -1,10 +1,12 @@
 from typing import TypedDict, List, Dict, Any, Optional
+from rag.candidates import SearchCandidates
 
 
 class SimpleAgentState(TypedDict):
     """Simplified state - no intent analysis needed"""
     query: str
     search_results: List[Dict[str, Any]]
+    search_candidates: Optional[SearchCandidates]  # Row ids + scores; refine materializes the survivors
     recommendations: List[Dict[str, Any]]
     explanation: str
     formatted_response: Optional[Dict[str, Any]]
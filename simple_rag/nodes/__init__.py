@@ -1,12 +1,12 @@
-from simple_rag.nodes.simple_search_node import simple_search_node
+from simple_rag.nodes.simple_search_node import simple_search_node, asimple_search_node
 from simple_rag.nodes.simple_refine_node import simple_refine_node
 from simple_rag.nodes.simple_explain_node import simple_explain_node
 from simple_rag.nodes.simple_format_node import simple_format_node
 
 __all__ = [
     "simple_search_node",
+    "asimple_search_node",
     "simple_refine_node",
     "simple_explain_node",
     "simple_format_node",
 ]
-
@@ -1,6 +1,9 @@
-import re
+import logging
 from typing import Dict, Any, List
 from simple_rag.agent.simple_state import SimpleAgentState
+from rag.price_patterns import parse_price_bounds
+
+logger = logging.getLogger(__name__)
 
 
 def _extract_numeric_field(products: List[Dict[str, Any]], field_name: str) -> List[float]:
@@ -72,7 +75,7 @@ def simple_explain_node(state: SimpleAgentState) -> SimpleAgentState:
     Generate explanation based on actual product data - NO LLM, NO HALLUCINATIONS
     Works dynamically with ANY product structure - no hardcoded fields
     """
-    print("💬 Generating explanation...")
+    logger.debug("💬 Generating explanation...")
 
     recommendations = state["recommendations"]
     query = state["query"]
@@ -82,8 +85,7 @@ def simple_explain_node(state: SimpleAgentState) -> SimpleAgentState:
         return state
 
     # Extract price constraint from query (if any)
-    price_match = re.search(r'(?:under|below|less than|max|maximum|up to)\s*\$?(\d+)', query.lower())
-    max_price = float(price_match.group(1)) if price_match else None
+    _, max_price = parse_price_bounds(query)
 
     # Analyze actual product data dynamically
     top_products = recommendations[:3]
@@ -181,5 +183,5 @@ def simple_explain_node(state: SimpleAgentState) -> SimpleAgentState:
         explanation = f"Found {len(recommendations)} products matching your search criteria."
     
     state["explanation"] = explanation
-    print(f"   Explanation: {explanation[:100]}...")
+    logger.debug("   Explanation: %s...", explanation[:100])
     return state
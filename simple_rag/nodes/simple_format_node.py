@@ -1,10 +1,15 @@
+import logging
 from typing import Dict, Any
 from simple_rag.agent.simple_state import SimpleAgentState
+from rag.metrics import RESULT_COUNT
+
+logger = logging.getLogger(__name__)
 
 
 def simple_format_node(state: SimpleAgentState) -> SimpleAgentState:
     """Format the final response"""
-    print("📋 Formatting response...")
+    logger.debug("📋 Formatting response...")
+    RESULT_COUNT.observe(len(state["recommendations"]), stage="recommendations")
     
     formatted_response: Dict[str, Any] = {
         "query": state["query"],
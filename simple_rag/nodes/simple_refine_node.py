@@ -1,21 +1,40 @@
-import re
+import logging
+
 from simple_rag.agent.simple_state import SimpleAgentState
+from rag.attribute_index import get_attribute_index
+from rag.filters import SearchFilter
+from rag.price_patterns import parse_price_bounds
+
+logger = logging.getLogger(__name__)
 
 
 def simple_refine_node(state: SimpleAgentState) -> SimpleAgentState:
     """Filter by price range extracted with regex (no LLM needed)"""
-    print("✨ Refining results...")
+    logger.debug("✨ Refining results...")
     
     query = state["query"].lower()
-    results = state["search_results"]
-    filtered = []
     
     # Extract price constraints with regex
-    max_match = re.search(r'(?:under|below|less than|max|maximum|up to)\s*\$?(\d+)', query)
-    max_price = float(max_match.group(1)) if max_match else float('inf')
+    min_price, max_price = parse_price_bounds(query)
     
-    min_match = re.search(r'(?:over|above|more than|min|minimum|from)\s*\$?(\d+)', query)
-    min_price = float(min_match.group(1)) if min_match else 0
+    candidates = state.get("search_candidates")
+    if candidates is not None:
+        # Vectorized price mask over the candidate row ids, dicts only for survivors
+        price_filter = SearchFilter(min_price=min_price, max_price=max_price)
+        if not price_filter.is_empty():
+            candidates = candidates.select(
+                price_filter.mask(get_attribute_index(candidates.vectorstore), candidates.row_ids)
+            )
+        state["recommendations"] = candidates.head(8).to_results()
+        logger.debug("   %d recommendations", len(state["recommendations"]))
+        return state
+    
+    results = state["search_results"]
+    filtered = []
+    if max_price is None:
+        max_price = float('inf')
+    if min_price is None:
+        min_price = 0
     
     # Filter by price
     for result in results:
@@ -24,6 +43,6 @@ def simple_refine_node(state: SimpleAgentState) -> SimpleAgentState:
             filtered.append(result)
     
     state["recommendations"] = filtered[:8]
-    print(f"   {len(state['recommendations'])} recommendations")
+    logger.debug("   %d recommendations", len(state["recommendations"]))
     return state
 
@@ -1,21 +1,40 @@
+import logging
+
 from simple_rag.agent.simple_state import SimpleAgentState
-from rag.query import query_vector_store  # Reuse existing query function
+from rag.adaptive_search import filtered_search  # Reuse existing search helpers
+from rag.filters import SearchFilter
+from rag.price_patterns import parse_price_bounds
+from config.settings import settings
+from rag.executors import run_cpu_bound
+
+logger = logging.getLogger(__name__)
 
 
 def simple_search_node(state: SimpleAgentState, vectorstore) -> SimpleAgentState:
     """Search products using raw query - no intent analysis needed"""
-    print("🔍 Searching products...")
+    logger.debug("🔍 Searching products...")
     
     # Vector search is semantic, so raw query works great!
-    results = query_vector_store(
+    # Regex price bounds (same ones simple_refine_node applies) filter the search
+    min_price, max_price = parse_price_bounds(state["query"])
+    search_filter = None
+    if min_price is not None or max_price is not None:
+        search_filter = SearchFilter(min_price=min_price, max_price=max_price)
+    
+    candidates = filtered_search(
         state["query"],
-        vectorstore=vectorstore,
-        k=15,
-        format_results=True,
-        max_score=1.3
+        vectorstore,
+        search_filter,
+        k=settings.DEFAULT_SEARCH_K,
+        target=settings.MAX_RECOMMENDATIONS_TO_RETURN,
+        max_score=settings.MAX_SIMILARITY_SCORE
     )
     
-    state["search_results"] = results
-    print(f"   Found {len(results)} products")
+    state["search_candidates"] = candidates
+    logger.debug("   Found %d products", len(candidates))
     return state
 
+
+async def asimple_search_node(state: SimpleAgentState, vectorstore) -> SimpleAgentState:
+    """Async variant - runs the embedding + FAISS search on the bounded CPU pool"""
+    return await run_cpu_bound(simple_search_node, state, vectorstore=vectorstore)
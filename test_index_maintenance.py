@@ -0,0 +1,75 @@
+"""
+Test catalog diffs (delete, then upsert, then query) on every FAISS index kind
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import rag.agent  # noqa: F401  (import order: rag.agent before rag.query)
+from benchmarks.worker_memory import synthetic_products
+from config.settings import settings
+from rag.create_vector_store import create_load_vector_store
+from rag.index_factory import INDEX_KINDS
+from rag.index_maintenance import apply_diff_to_store, load_manifest
+from rag.ingest import create_product_content
+from rag.query import query_vector_store
+from rag.vector_store_registry import DEFAULT_PRODUCTS_PATH
+
+ROWS = 200
+embeddings = DeterministicFakeEmbedding(size=32)
+products = synthetic_products(DEFAULT_PRODUCTS_PATH, ROWS)
+changed = {**products[10], "description": "Completely rewritten description."}
+added = {**products[0], "id": ROWS + 1, "name": "Brand New Product"}
+
+print("=" * 60)
+print("Testing delete -> upsert -> query per index kind")
+print("=" * 60)
+
+failures = 0
+for kind in INDEX_KINDS:
+    settings.FAISS_INDEX_TYPE = kind
+    with tempfile.TemporaryDirectory() as tmp:
+        # A nested, absolute store path
+        store_path = Path(tmp) / "stores" / kind
+        products_path = Path(tmp) / "products.json"
+        products_path.write_text(json.dumps(products))
+        create_load_vector_store(name=str(store_path), products_path=products_path, embeddings=embeddings)
+        try:
+            deleted = apply_diff_to_store({"delete": ["1", "2", "3"]}, name=str(store_path), embeddings=embeddings)
+            upserted = apply_diff_to_store({"upsert": [changed, added]}, name=str(store_path), embeddings=embeddings)
+            writable = create_load_vector_store(name=str(store_path), embeddings=embeddings, writable=True)
+            index_ids = set(writable.index_to_docstore_id.values())
+            manifest_ids = {entry["docstore_id"] for entry in load_manifest(store_path).values()}
+            assert deleted["deleted"] == 3 and upserted == {"added": 1, "updated": 1, "deleted": 0, "unchanged": 0}
+            assert writable.index.ntotal == len(writable.index_to_docstore_id) == ROWS - 2
+            assert index_ids == manifest_ids
+
+            # Served the way the API loads it; a product's own content must find that product
+            vectorstore = create_load_vector_store(name=str(store_path), embeddings=embeddings)
+            for product in (added, changed, products[50]):
+                results = query_vector_store(
+                    create_product_content(product), vectorstore=vectorstore, k=5, max_score=None, format_results=True
+                )
+                result_ids = [result["id"] for result in results]
+                assert not {1, 2, 3} & set(result_ids), f"deleted products returned: {result_ids}"
+                # IVF-PQ only keeps lossy codes, so its exact match just has to be near the top
+                expected_rank = result_ids[:5] if kind == "ivfpq" else result_ids[:1]
+                assert product["id"] in expected_rank, f"product {product['id']} not found: {result_ids}"
+            print(f"   ✅ {kind}: {vectorstore.index.ntotal} rows")
+        except Exception as e:
+            failures += 1
+            print(f"   ❌ {kind}: {type(e).__name__}: {e}")
+
+print("\n" + "=" * 60)
+if failures:
+    print(f"❌ {failures} index kind(s) failed")
+    sys.exit(1)
+print("✅ All index kinds passed!")
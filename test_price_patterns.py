@@ -0,0 +1,60 @@
+"""
+Test price parsing shared by the rule intent parser and the fast pipeline
+"""
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from rag.price_patterns import parse_price_bounds
+from rag.rule_intent import extract_intent
+
+PRICE_CASES = [
+    ("Best running shoes under $200", (None, 200.0)),
+    ("headphones under 200 dollars", (None, 200.0)),
+    ("laptop over $500", (500.0, None)),
+    ("yoga mat between $20 and $40", (20.0, 40.0)),
+    ("desk lamp $30-$60", (30.0, 60.0)),
+    ("headphones from 50 to 80 dollars", (50.0, 80.0)),
+    ("backpack from 100 to $150", (100.0, 150.0)),
+    ("phone case 10-20 bucks", (10.0, 20.0)),
+    # Ranges without a currency marker are not prices
+    ("tent between 2 and 4 people under $100", (None, 100.0)),
+    ("headphones from 20 to 30 hours battery under $150", (None, 150.0)),
+    ("headphones from 200 to 300 hours battery", (None, None)),
+]
+
+PRODUCT_CASES = [
+    ("headphones under 200 dollars", "headphones"),
+    ("running shoes between 50 and 80 usd", "running shoes"),
+]
+
+print("=" * 60)
+print("Testing price bounds")
+print("=" * 60)
+
+failures = 0
+for query, expected in PRICE_CASES:
+    bounds = parse_price_bounds(query)
+    if bounds == expected:
+        print(f"   ✅ {query!r} -> {bounds}")
+    else:
+        failures += 1
+        print(f"   ❌ {query!r} -> {bounds}, expected {expected}")
+
+for query, expected in PRODUCT_CASES:
+    product = extract_intent(query).intent.product
+    if product == expected:
+        print(f"   ✅ {query!r} -> product {product!r}")
+    else:
+        failures += 1
+        print(f"   ❌ {query!r} -> product {product!r}, expected {expected!r}")
+
+print("\n" + "=" * 60)
+if failures:
+    print(f"❌ {failures} case(s) failed")
+    sys.exit(1)
+print("✅ All price cases passed!")